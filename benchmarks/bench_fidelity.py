@@ -0,0 +1,114 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from boards import make_env
+from suika.part2.config import config
+
+
+def play(task):
+    # One seeded episode with seeded uniform random drops, so every physics
+    # setting sees the same starts and the same action stream.
+    hz, iterations, seed, max_moves = task
+    env = make_env(physics_hz=hz, solver_iterations=iterations)
+    obs, info = env.reset(seed=seed)
+    actions = np.random.default_rng(seed).integers(0, env.action_space.n, max_moves)
+
+    heights = []
+    start = time.perf_counter()
+    for action in actions:
+        obs, reward, terminated, truncated, info = env.step(action)
+        # obs[8] is the top of the highest fruit over the screen height
+        heights.append(config.pad.bot - obs[8] * env.screen_height)
+        if terminated or truncated:
+            break
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return {
+        "hz": hz,
+        "iterations": iterations,
+        "score": info["score"],
+        "final_height": heights[-1],
+        "max_height": max(heights),
+        "game_over": info["game_over"],
+        "moves": len(heights),
+        "seconds": elapsed,
+    }
+
+
+def ks_distance(a, b):
+    # two-sample Kolmogorov-Smirnov statistic: the largest gap between the
+    # empirical CDFs, 0 for identical distributions and 1 for disjoint ones
+    a = np.sort(a)
+    b = np.sort(b)
+    values = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, values, side="right") / len(a)
+    cdf_b = np.searchsorted(b, values, side="right") / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+
+def summarize(episodes, reference):
+    moves = sum(e["moves"] for e in episodes)
+    seconds = sum(e["seconds"] for e in episodes)
+    summary = {"moves_per_sec": moves / seconds}
+    for key in ("score", "final_height", "max_height"):
+        values = np.array([e[key] for e in episodes], dtype=np.float64)
+        summary[f"{key}_mean"] = float(values.mean())
+        summary[f"{key}_std"] = float(values.std())
+        summary[f"{key}_ks"] = ks_distance(values, [e[key] for e in reference])
+    summary["game_over_rate"] = float(np.mean([e["game_over"] for e in episodes]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare outcome distributions and speed at coarser physics settings")
+    parser.add_argument("--hz", type=float, nargs="+", default=[60, 45, 30, 20, 15], help="Physics rates to compare")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[10], help="Solver iterations to compare")
+    parser.add_argument("--reference-hz", type=float, default=config.physics.hz, help="Rate treated as ground truth")
+    parser.add_argument("--reference-iterations", type=int, default=config.physics.iterations,
+                        help="Solver iterations treated as ground truth")
+    parser.add_argument("--episodes", type=int, default=20, help="Seeded episodes per setting")
+    parser.add_argument("--max-moves", type=int, default=100, help="Drops per episode at most")
+    parser.add_argument("--seed", type=int, default=0, help="First episode seed")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count(), help="Episode worker processes")
+    parser.add_argument("--output", type=str, default=None, help="Write the per-setting summary to this JSON file")
+    args = parser.parse_args()
+
+    reference = (args.reference_hz, args.reference_iterations)
+    settings = list(itertools.product(args.hz, args.iterations))
+    if reference not in settings:
+        settings.insert(0, reference)
+
+    seeds = range(args.seed, args.seed + args.episodes)
+    tasks = [(hz, it, seed, args.max_moves) for hz, it in settings for seed in seeds]
+    with mp.Pool(args.workers) as pool:
+        results = pool.map(play, tasks)
+
+    by_setting = {s: [r for r in results if (r["hz"], r["iterations"]) == s] for s in settings}
+    summaries = {s: summarize(episodes, by_setting[reference]) for s, episodes in by_setting.items()}
+    base_rate = summaries[reference]["moves_per_sec"]
+
+    print(f"{args.episodes} episodes of up to {args.max_moves} drops per setting, "
+          f"KS distance against {reference[0]:g} Hz / {reference[1]} iterations")
+    print(f"{'hz':>6} {'iters':>5} {'moves/s':>8} {'speedup':>8} {'score':>14} {'KS':>5} "
+          f"{'max height':>14} {'KS':>5} {'game over':>9}")
+    for (hz, iterations), s in summaries.items():
+        print(f"{hz:>6g} {iterations:>5} {s['moves_per_sec']:>8.1f} {s['moves_per_sec'] / base_rate:>7.2f}x "
+              f"{s['score_mean']:>7.1f} ±{s['score_std']:>5.1f} {s['score_ks']:>5.2f} "
+              f"{s['max_height_mean']:>7.1f} ±{s['max_height_std']:>5.1f} {s['max_height_ks']:>5.2f} "
+              f"{s['game_over_rate']:>9.0%}")
+
+    if args.output:
+        report = {f"{hz:g}hz_{it}it": s for (hz, it), s in summaries.items()}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import timeit
+
+import numpy as np
+
+from boards import make_env, make_board
+from suika_env import MAX_TYPE, MAX_RADIUS
+from suika.part2.config import config
+
+
+def legacy_get_obs(env):
+    # The original per-fruit implementation, kept as the reference layout.
+    obs = np.zeros(env.observation_space.shape, dtype=np.float32)
+
+    W = float(env.screen_width)
+    H = float(env.screen_height)
+
+    obs[0] = env.cloud.curr.n / MAX_TYPE
+    obs[1] = env.cloud.curr.radius / MAX_RADIUS
+    obs[2] = env.cloud.next.n / MAX_TYPE
+    obs[3] = env.cloud.next.radius / MAX_RADIUS
+    obs[4] = config.pad.left / W
+    obs[5] = config.pad.right / W
+    obs[6] = config.pad.bot / H
+    obs[7] = config.pad.killy / H
+
+    fruits = []
+    min_y = H
+    for p in env.space.particles:
+        fruits.append(p)
+        if (p.pos[1] - p.radius) < min_y:
+            min_y = p.pos[1] - p.radius
+
+    obs[8] = min_y / H
+
+    fruits.sort(key=lambda p: (p.pos[1], p.pos[0]))
+
+    idx = 9
+    for p in fruits[:env.max_fruits]:
+        obs[idx] = p.n / MAX_TYPE
+        obs[idx+1] = p.pos[0] / W
+        obs[idx+2] = p.pos[1] / H
+        obs[idx+3] = p.radius / MAX_RADIUS
+        idx += 4
+
+    return obs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SuikaEnv._get_obs against the per-fruit loop")
+    parser.add_argument("--fruits", type=int, nargs="+", default=[10, 30, 50], help="Fruit counts to measure")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats, the best one is reported")
+    args = parser.parse_args()
+
+    env = make_env(reuse_obs_buffer=True)
+
+    print(f"{'fruits':>6} {'legacy us':>10} {'buffer us':>10} {'speedup':>8}")
+    for n_fruits in args.fruits:
+        make_board(env, n_fruits, seed=n_fruits)
+        if legacy_get_obs(env).tobytes() != env._get_obs().tobytes():
+            raise SystemExit(f"Observation mismatch with {n_fruits} fruits")
+
+        legacy = min(timeit.repeat(lambda: legacy_get_obs(env), number=args.number, repeat=args.repeat))
+        buffered = min(timeit.repeat(env._get_obs, number=args.number, repeat=args.repeat))
+        legacy_us = legacy / args.number * 1e6
+        buffered_us = buffered / args.number * 1e6
+        print(f"{n_fruits:>6} {legacy_us:>10.2f} {buffered_us:>10.2f} {legacy_us / buffered_us:>7.1f}x")
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
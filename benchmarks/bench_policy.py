@@ -0,0 +1,96 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+
+# not boards.py: importing the env would count pygame and gymnasium towards
+# both policies' startup
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RL_ENV_DIR = os.path.join(os.path.dirname(BENCH_DIR), "rl_env")
+if RL_ENV_DIR not in sys.path:
+    sys.path.append(RL_ENV_DIR)
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(BENCH_DIR), "suika_dqn_mlp_final.zip")
+
+
+def child(kind, path, batch_sizes, number):
+    # startup is import + load + one action, timed from interpreter start
+    import numpy as np
+    if kind == "numpy":
+        from numpy_policy import NumpyPolicy
+        policy = NumpyPolicy(path)
+    else:
+        from stable_baselines3 import DQN
+        policy = DQN.load(path, device="cpu")
+    obs_dim = 209
+    rng = np.random.default_rng(0)
+    policy.predict(rng.random(obs_dim, dtype=np.float32), deterministic=True)
+    startup = time.perf_counter() - START
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latency = {}
+    for batch in batch_sizes:
+        obs = rng.random((batch, obs_dim), dtype=np.float32)
+        if batch == 1:
+            obs = obs[0]
+        times = []
+        for _ in range(number):
+            start = time.perf_counter()
+            policy.predict(obs, deterministic=True)
+            times.append(time.perf_counter() - start)
+        latency[batch] = statistics.median(times) * 1e6
+    print(json.dumps({"seconds": startup, "rss_mb": rss_kb / 1024, "latency_us": latency}))
+
+
+def measure(kind, path, batch_sizes, number, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", kind, "--model", path,
+             "--batch-sizes", *map(str, batch_sizes), "--number", str(number)],
+            capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare startup, peak RSS and predict latency of SB3 and the NumPy policy")
+    parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="SB3 DQN zip")
+    parser.add_argument("--npz", type=str, default=None, help="NumPy export of --model (exported to a temp file if not given)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256], help="Observations per predict call")
+    parser.add_argument("--number", type=int, default=2000, help="Timed predict calls per batch size")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh processes started per policy")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.model, args.batch_sizes, args.number)
+        return
+
+    npz = args.npz
+    if npz is None:
+        import tempfile
+        from numpy_policy import export
+        npz = export(args.model, os.path.join(tempfile.mkdtemp(), "policy.npz"))
+
+    paths = {"sb3": args.model, "numpy": npz}
+    print(f"{'policy':>8} {'startup s':>10} {'peak RSS MB':>12}" + "".join(f" {f'us @{b}':>10}" for b in args.batch_sizes))
+    for kind, path in paths.items():
+        runs = measure(kind, path, args.batch_sizes, args.number, args.repeat)
+        seconds = statistics.median(r["seconds"] for r in runs)
+        rss = statistics.median(r["rss_mb"] for r in runs)
+        # the fastest process, as outside noise only ever adds time
+        latency = {b: min(r["latency_us"][str(b)] for r in runs) for b in args.batch_sizes}
+        print(f"{kind:>8} {seconds:>10.3f} {rss:>12.1f}" + "".join(f" {latency[b]:>10.1f}" for b in args.batch_sizes))
+
+
+if __name__ == "__main__":
+    main()
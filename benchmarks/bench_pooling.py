@@ -0,0 +1,100 @@
+import argparse
+import gc
+import statistics
+import time
+
+import numpy as np
+
+from boards import make_env, make_board, settle_board
+
+MODES = {
+    "new objects": {},
+    "pool_particles": {"pool_particles": True},
+    "reuse_space": {"reuse_space": True},
+}
+
+
+class GCWatch:
+    # counts and times the collector's runs per generation via gc.callbacks
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.seconds = 0.0
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.seconds += time.perf_counter() - self._start
+            self.collections[info["generation"]] += 1
+
+    def __enter__(self):
+        gc.collect()
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+
+
+def reset_latency(env, n_fruits, number, random_start):
+    # each reset tears down a settled board of n_fruits
+    times = []
+    for seed in range(number):
+        make_board(env, n_fruits, seed=seed)
+        settle_board(env, substeps=30)
+        start = time.perf_counter()
+        env.reset(seed=seed, options={"random_start": random_start})
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def long_run(env, moves, seed):
+    # random drops with resets in between, as a training worker sees them
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    episodes = 0
+    with GCWatch() as watch:
+        start = time.perf_counter()
+        for _ in range(moves):
+            obs, reward, terminated, truncated, info = env.step(int(rng.integers(env.action_space.n)))
+            if terminated or truncated:
+                episodes += 1
+                env.reset(seed=int(rng.integers(2 ** 31)))
+        elapsed = time.perf_counter() - start
+    return elapsed, episodes, watch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reset latency and GC activity with space and particle reuse")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES), help="Modes to compare")
+    parser.add_argument("--fruits", type=int, nargs="+", default=[10, 30, 50], help="Board sizes torn down by reset")
+    parser.add_argument("--number", type=int, default=200, help="Resets timed per board size")
+    parser.add_argument("--moves", type=int, default=3000, help="Moves in the long run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the long run")
+    args = parser.parse_args()
+
+    print("Median reset latency (us), tearing down a settled board")
+    print(f"{'mode':>16} {'random start':>12}" + "".join(f" {f'{n} fruits':>10}" for n in args.fruits))
+    for mode in args.modes:
+        env = make_env(**MODES[mode])
+        for random_start in (False, True):
+            times = [reset_latency(env, n, args.number, random_start) for n in args.fruits]
+            print(f"{mode:>16} {str(random_start):>12}" + "".join(f" {t:>10.1f}" for t in times))
+        env.close()
+
+    print(f"\n{args.moves} random moves with resets")
+    print(f"{'mode':>16} {'moves/s':>8} {'episodes':>8} {'gen0':>6} {'gen1':>6} {'gen2':>6} {'gc ms':>8} {'reused':>8}")
+    for mode in args.modes:
+        env = make_env(**MODES[mode])
+        elapsed, episodes, watch = long_run(env, args.moves, args.seed)
+        pool = env.particle_pool
+        reused = f"{pool.reused / (pool.reused + pool.created):.0%}" if pool is not None else "-"
+        gen0, gen1, gen2 = watch.collections
+        print(f"{mode:>16} {args.moves / elapsed:>8.1f} {episodes:>8} {gen0:>6} {gen1:>6} {gen2:>6} "
+              f"{watch.seconds * 1000:>8.1f} {reused:>8}")
+        env.close()
+
+
+if __name__ == "__main__":
+    main()
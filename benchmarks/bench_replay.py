@@ -0,0 +1,94 @@
+import argparse
+import time
+
+import numpy as np
+from stable_baselines3.common.buffers import ReplayBuffer
+
+from boards import make_env, make_board
+from replay_buffer import QuantizedReplayBuffer
+
+
+def buffer_bytes(buffer):
+    if isinstance(buffer, QuantizedReplayBuffer):
+        return buffer.nbytes
+    arrays = (buffer.observations, buffer.next_observations, buffer.actions,
+              buffer.rewards, buffer.dones, buffer.timeouts)
+    return sum(a.nbytes for a in arrays)
+
+
+def real_observations(count):
+    # observations of seeded boards from empty to full, cycled to fill the buffer
+    env = make_env()
+    obs = np.stack([
+        make_board(env, int(n_fruits), seed=int(n_fruits))._get_obs()
+        for n_fruits in np.linspace(0, env.max_fruits, count).astype(int)
+    ])
+    spaces = env.observation_space, env.action_space
+    env.close()
+    return obs, spaces
+
+
+def fill(buffer, obs, size, episode_len):
+    # each episode's first observation is not the previous step's next one, so
+    # a terminal next_obs only comes back right if the buffer kept it aside
+    obs_idx = np.empty(size, dtype=np.int64)
+    next_idx = np.empty(size, dtype=np.int64)
+    current = 0
+    infos = [{}]
+    start = time.perf_counter()
+    for t in range(size):
+        done = (t + 1) % episode_len == 0
+        obs_idx[t], next_idx[t] = current, (current + 1) % len(obs)
+        buffer.add(obs[obs_idx[t]], obs[next_idx[t]], np.array([t % 128]),
+                   np.array([1.0]), np.array([done]), infos)
+        current = (next_idx[t] + (len(obs) // 2 if done else 0)) % len(obs)
+    return time.perf_counter() - start, obs_idx, next_idx
+
+
+def max_error(buffer, obs, obs_idx, next_idx):
+    # every transition sample() can return against the float32 observations
+    # it came from; once full, row pos only holds the newest next_obs
+    rows = np.arange(len(obs_idx))
+    if buffer.full:
+        rows = rows[rows != buffer.pos]
+    np.random.seed(0)
+    batch = buffer._get_samples(rows)
+    obs_error = np.abs(batch.observations.numpy() - obs[obs_idx[rows]]).max()
+    next_error = np.abs(batch.next_observations.numpy() - obs[next_idx[rows]]).max()
+    return float(obs_error), float(next_error)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare replay buffer memory and sampling speed by observation dtype")
+    parser.add_argument("--size", type=int, default=200000, help="Transitions stored per buffer")
+    parser.add_argument("--batch-size", type=int, default=32, help="Transitions per sampled batch")
+    parser.add_argument("--samples", type=int, default=2000, help="Batches sampled per buffer")
+    parser.add_argument("--episode-len", type=int, default=100, help="Moves per stored episode")
+    args = parser.parse_args()
+
+    obs, (obs_space, action_space) = real_observations(64)
+    kinds = {
+        "sb3 float32": lambda: ReplayBuffer(args.size, obs_space, action_space, device="cpu"),
+        "float16": lambda: QuantizedReplayBuffer(args.size, obs_space, action_space, device="cpu", obs_dtype="float16"),
+        "uint8": lambda: QuantizedReplayBuffer(args.size, obs_space, action_space, device="cpu", obs_dtype="uint8"),
+    }
+
+    print(f"{'buffer':>12} {'MB':>8} {'MB @1M':>8} {'add us':>8} {'sample us':>10} {'obs error':>10} {'next error':>10}")
+    for name, make in kinds.items():
+        buffer = make()
+        add_s, obs_idx, next_idx = fill(buffer, obs, args.size, args.episode_len)
+
+        buffer.sample(args.batch_size)
+        start = time.perf_counter()
+        for _ in range(args.samples):
+            buffer.sample(args.batch_size)
+        sample_s = time.perf_counter() - start
+
+        mb = buffer_bytes(buffer) / 1e6
+        obs_error, next_error = max_error(buffer, obs, obs_idx, next_idx)
+        print(f"{name:>12} {mb:>8.1f} {mb * 1e6 / args.size:>8.0f} {add_s / args.size * 1e6:>8.2f} "
+              f"{sample_s / args.samples * 1e6:>10.1f} {obs_error:>10.2e} {next_error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+
+MODES = {
+    # headless training worker: no window, nothing is ever drawn
+    "headless": {"render_mode": None, "draw": False},
+    # off-screen rendering: sprites and fonts load on the first frame
+    "rgb_array": {"render_mode": "rgb_array", "draw": True},
+    # a real window, using SDL's dummy driver when there is no display
+    "human": {"render_mode": "human", "draw": True},
+}
+
+
+def child(mode):
+    from boards import make_env
+
+    settings = MODES[mode]
+    env = make_env(render_mode=settings["render_mode"])
+    env.reset(seed=0)
+    env.step(env.action_space.n // 2)
+    if settings["draw"]:
+        env._draw_frame()
+    elapsed = time.perf_counter() - START
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    env.close()
+    print(json.dumps({"seconds": elapsed, "rss_mb": rss_kb / 1024}))
+
+
+def measure(mode, repeat):
+    env = dict(os.environ)
+    if mode == "human" and not env.get("DISPLAY"):
+        env["SDL_VIDEODRIVER"] = "dummy"
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker startup time and peak RSS for each render mode")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES), help="Render modes to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes started per mode")
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    print(f"{'mode':>10} {'startup s':>10} {'peak RSS MB':>12}")
+    for mode in args.modes:
+        runs = measure(mode, args.repeat)
+        seconds = statistics.median(r["seconds"] for r in runs)
+        rss = statistics.median(r["rss_mb"] for r in runs)
+        print(f"{mode:>10} {seconds:>10.3f} {rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import pymunk
+
+from boards import BENCH_DIR, make_env, make_board, make_merge_board, settle_board
+from suika.part2 import collision
+import start_pool
+
+# Each case is timed call by call. setup() runs untimed before every call and
+# returns the arguments for it, so cases that change the board (step, merges)
+# always start from the same seeded fixture. Cases that leave the board alone
+# time `batch` calls per sample to keep the timer out of the result.
+
+
+def timed(setup, call, number, warmup=1, batch=1):
+    times = []
+    for i in range(warmup + number):
+        args = setup()
+        # as in timeit, keep garbage collection out of the timed calls
+        gc.disable()
+        start = time.perf_counter()
+        for _ in range(batch):
+            call(*args)
+        elapsed = (time.perf_counter() - start) / batch
+        gc.enable()
+        if i >= warmup:
+            times.append(elapsed)
+    return summarize(times)
+
+
+def summarize(times):
+    number = len(times)
+    return {
+        "median_us": statistics.median(times) * 1e6,
+        "min_us": min(times) * 1e6,
+        "mean_us": statistics.fmean(times) * 1e6,
+        "stdev_us": (statistics.stdev(times) if len(times) > 1 else 0.0) * 1e6,
+        "number": number,
+    }
+
+
+def settled_state(env, n_fruits):
+    make_board(env, n_fruits, seed=n_fruits)
+    settle_board(env)
+    return env.get_state()
+
+
+def bench_reset(env, n_fruits, number, random_start, pool=None):
+    # fruits is the board being torn down; the new board is seeded per call
+    state = settled_state(env, n_fruits)
+    seeds = iter(range(10 ** 6))
+
+    def setup():
+        env.set_state(state)
+        return next(seeds),
+
+    env.start_pool = pool
+    try:
+        return timed(setup, lambda seed: env.reset(seed=seed, options={"random_start": random_start}), number)
+    finally:
+        env.start_pool = None
+
+
+def bench_reset_start_pool(env, n_fruits, number):
+    # the same seeded random starts as reset_random_start, rebuilt from a
+    # pool settled up front (one board per call, warmup included)
+    pool = start_pool.build(number + 1)
+    return bench_reset(env, n_fruits, number, random_start=True, pool=pool)
+
+
+def bench_step(env, n_fruits, number):
+    state = settled_state(env, n_fruits)
+    action = env.action_space.n // 2
+
+    def setup():
+        env.set_state(state)
+        return action,
+
+    return timed(setup, env.step, number)
+
+
+def bench_set_state(env, n_fruits, number):
+    # restoring a settled board over itself, as rebuild_each_step does
+    state = settled_state(env, n_fruits)
+    return timed(lambda: (state,), env.set_state, number)
+
+
+def bench_get_obs(env, n_fruits, number):
+    settled_state(env, n_fruits)
+    return timed(lambda: (), env._get_obs, number, batch=20)
+
+
+def bench_resolve_collision(env, n_fruits, number):
+    # resolve_collision only behaves as in the game while pymunk is inside a
+    # step, so time each call the collision handler makes while merge boards
+    # are stepped
+    times = []
+    resolve = collision.resolve_collision
+
+    def timed_resolve(*args):
+        start = time.perf_counter()
+        resolve(*args)
+        times.append(time.perf_counter() - start)
+
+    collision.resolve_collision = timed_resolve
+    try:
+        seed = n_fruits
+        while len(times) < number:
+            make_merge_board(env, n_fruits, seed=seed)
+            gc.disable()
+            env.space.step(1 / 60)
+            gc.enable()
+            seed += 1
+    finally:
+        collision.resolve_collision = resolve
+    return summarize(times)
+
+
+def bench_merge_step(env, n_fruits, number):
+    # one physics step on a board of overlapping same-type pairs, where the
+    # collision handler merges every pair
+    def setup():
+        make_merge_board(env, n_fruits, seed=n_fruits)
+        return ()
+
+    return timed(setup, lambda: env.space.step(1 / 60), number)
+
+
+def bench_draw_frame(env, n_fruits, number):
+    settled_state(env, n_fruits)
+    return timed(lambda: (), env._draw_frame, number, batch=5)
+
+
+CASES = {
+    "reset": lambda env, n, k: bench_reset(env, n, k, random_start=False),
+    "reset_random_start": lambda env, n, k: bench_reset(env, n, k, random_start=True),
+    "reset_start_pool": bench_reset_start_pool,
+    "step": bench_step,
+    "set_state": bench_set_state,
+    "get_obs": bench_get_obs,
+    "resolve_collision": bench_resolve_collision,
+    "merge_step": bench_merge_step,
+    "draw_frame": bench_draw_frame,
+}
+
+# calls per case relative to --number, so slow cases finish in similar time
+SCALE = {
+    "reset": 1.0,
+    "reset_random_start": 0.1,
+    "reset_start_pool": 0.1,
+    "step": 0.2,
+    "set_state": 1.0,
+    "get_obs": 1.0,
+    "resolve_collision": 2.0,
+    "merge_step": 1.0,
+    "draw_frame": 0.5,
+}
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(cases, fruit_counts, number, repeat):
+    # Repeats go round every case in turn so a slow spell on the machine hits
+    # them all alike, and the repeat with the lowest median is kept, as with
+    # timeit, since outside noise only ever adds time.
+    env = make_env(render_mode="rgb_array")
+    results = {}
+    for _ in range(repeat):
+        for case in cases:
+            calls = max(3, int(number * SCALE[case]))
+            for n_fruits in fruit_counts:
+                name = f"{case}[fruits={n_fruits}]"
+                result = CASES[case](env, n_fruits, calls)
+                if name not in results or result["median_us"] < results[name]["median_us"]:
+                    results[name] = result
+    for name, result in results.items():
+        print(f"{name:>34} {result['median_us']:>12.1f} us")
+    env.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'case':>34} {'base us':>10} {'now us':>10} {'ratio':>7}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:>34} {'-':>10} {now['median_us']:>10.1f} {'new':>7}")
+            continue
+        ratio = now["median_us"] / base["median_us"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:>34} {base['median_us']:>10.1f} {now['median_us']:>10.1f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the env and physics hot paths on seeded boards")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES), help="Cases to run")
+    parser.add_argument("--fruits", type=int, nargs="+", default=[0, 10, 30, 50], help="Fruit counts per case")
+    parser.add_argument("--number", type=int, default=100, help="Base number of timed calls per case")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per case, the fastest is kept")
+    parser.add_argument("--output", type=str, default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Median slowdown over the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    results = run(args.cases, args.fruits, args.number, args.repeat)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pymunk": pymunk.version,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nComparing with {args.compare} (commit {baseline['meta'].get('commit')})")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            raise SystemExit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RL_ENV_DIR = os.path.join(os.path.dirname(BENCH_DIR), "rl_env")
+if RL_ENV_DIR not in sys.path:
+    sys.path.append(RL_ENV_DIR)
+
+from suika_env import SuikaEnv
+from suika.part2.config import config
+from suika.part2.particle import spawn
+
+
+def make_env(**kwargs):
+    kwargs.setdefault("action_type", "discrete")
+    return SuikaEnv(**kwargs)
+
+
+def make_board(env, n_fruits, seed=0, max_type=6):
+    # Empty board with n_fruits placed at seeded random spots inside the pad.
+    # The fruits are not simulated, so the layout is identical on every run.
+    env.reset(seed=seed, options={"random_start": False})
+    rng = np.random.default_rng(seed)
+    for _ in range(n_fruits):
+        n = rng.integers(0, max_type)
+        radius = config[n, "radius"]
+        x = rng.uniform(config.pad.left + radius, config.pad.right - radius)
+        y = rng.uniform(config.pad.killy + radius, config.pad.bot - radius)
+        spawn((x, y), n, env.space)
+    return env
+
+
+def make_merge_board(env, n_fruits, seed=0, max_type=4):
+    # Like make_board, but the fruits come in overlapping same-type pairs (at
+    # least one), so a single physics step merges every pair.
+    env.reset(seed=seed, options={"random_start": False})
+    rng = np.random.default_rng(seed)
+    pairs = []
+    for _ in range(max(1, n_fruits // 2)):
+        n = rng.integers(0, max_type)
+        radius = config[n, "radius"]
+        x = rng.uniform(config.pad.left + 2 * radius, config.pad.right - 2 * radius)
+        y = rng.uniform(config.pad.killy + radius, config.pad.bot - radius)
+        pairs.append((
+            spawn((x - radius / 2, y), n, env.space),
+            spawn((x + radius / 2, y), n, env.space),
+        ))
+    return pairs
+
+
+def settle_board(env, substeps=120):
+    # Lets a fixture board come to rest so timings are not dominated by the
+    # overlap between fruits that make_board places independently.
+    for _ in range(substeps):
+        env.space.step(1 / config.screen.fps)
+    return env
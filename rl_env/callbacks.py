@@ -0,0 +1,211 @@
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.logger import TensorBoardOutputFormat
+
+from worker_threads import limit_threads
+
+
+class StepTimingCallback(BaseCallback):
+    # Logs env-steps/sec and, for envs made with profile=True, the mean ms
+    # each phase took per env step (info["timings"]) over the last
+    # log_freq calls. The values go out with the model's next log dump, so
+    # they land in the same TensorBoard run as the training stats.
+    def __init__(self, log_freq=1000, verbose=0):
+        super().__init__(verbose)
+        self.log_freq = log_freq
+        self._totals = defaultdict(float)
+        self._timed_steps = 0
+        self._start_time = None
+        self._start_steps = 0
+
+    def _on_training_start(self):
+        self._start_time = time.perf_counter()
+        self._start_steps = self.num_timesteps
+
+    def _on_step(self):
+        for info in self.locals.get("infos", ()):
+            timings = info.get("timings")
+            if timings is None:
+                continue
+            for phase, ms in timings.items():
+                self._totals[phase] += ms
+            self._timed_steps += 1
+
+        if self.n_calls % self.log_freq == 0:
+            self._record()
+        return True
+
+    def _record(self):
+        now = time.perf_counter()
+        elapsed = now - self._start_time
+        if elapsed > 0:
+            self.logger.record("timing/env_steps_per_sec", (self.num_timesteps - self._start_steps) / elapsed)
+        self._start_time = now
+        self._start_steps = self.num_timesteps
+
+        if self._timed_steps:
+            for phase, total in self._totals.items():
+                self.logger.record(f"timing/{phase}_ms", total / self._timed_steps)
+            self.logger.record("timing/env_total_ms", sum(self._totals.values()) / self._timed_steps)
+        self._totals.clear()
+        self._timed_steps = 0
+
+
+# Evaluator process state: the env and the last loaded checkpoint are kept
+# between tasks, so each episode only pays for a reset.
+_eval_env = None
+_eval_model = None
+_eval_path = None
+
+
+def _init_evaluator(env_kwargs, niceness):
+    global _eval_env
+    # evaluators run one board each and let the learner win any contention
+    # for the cores; torch is already loaded with this module, so its own
+    # pool is limited through set_num_threads
+    limit_threads(1)
+    import torch
+    torch.set_num_threads(1)
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+    from suika_env import SuikaEnv
+    _eval_env = SuikaEnv(**env_kwargs)
+
+
+def _evaluate_episode(model_class, path, seed, deterministic):
+    global _eval_model, _eval_path
+    if path != _eval_path:
+        _eval_model = model_class.load(path, device="cpu")
+        _eval_path = path
+
+    obs, info = _eval_env.reset(seed=seed, options={"random_start": True})
+    length = 0
+    done = False
+    while not done:
+        action, _ = _eval_model.predict(obs, deterministic=deterministic)
+        obs, reward, terminated, truncated, info = _eval_env.step(action)
+        length += 1
+        done = terminated or truncated
+    return info["score"], length
+
+
+class AsyncEvalCallback(BaseCallback):
+    # Every eval_freq calls the model is saved to eval_dir and handed to a
+    # pool of headless evaluator processes, which play n_episodes seeded
+    # episodes (seeds eval_seed ... eval_seed + n_episodes - 1, the same for
+    # every checkpoint) while training carries on. Finished evaluations are
+    # picked up on later steps without waiting and written to TensorBoard
+    # under eval/ at the step the checkpoint was taken, and appended to
+    # eval_dir/evaluations.jsonl. If max_pending checkpoints are still being
+    # evaluated the new one is skipped rather than queued.
+    def __init__(self, env_kwargs, eval_freq=250000, n_episodes=20, n_workers=2, eval_dir="eval_dqn/",
+                 eval_seed=0, deterministic=True, percentiles=(10, 25, 75, 90), max_pending=2,
+                 niceness=5, start_method="forkserver", wait_on_end=True, verbose=0):
+        super().__init__(verbose)
+        self.env_kwargs = dict(env_kwargs, render_mode=None, profile=False, recorder=None)
+        self.eval_freq = eval_freq
+        self.n_episodes = n_episodes
+        self.n_workers = n_workers
+        self.eval_dir = eval_dir
+        self.eval_seed = eval_seed
+        self.deterministic = deterministic
+        self.percentiles = percentiles
+        self.max_pending = max_pending
+        self.niceness = niceness
+        self.start_method = start_method
+        self.wait_on_end = wait_on_end
+        self._executor = None
+        # checkpoint timestep -> (path, futures), in submission order
+        self._pending = {}
+
+    def _on_training_start(self):
+        os.makedirs(self.eval_dir, exist_ok=True)
+        self._executor = ProcessPoolExecutor(
+            self.n_workers,
+            mp_context=mp.get_context(self.start_method),
+            initializer=_init_evaluator,
+            initargs=(self.env_kwargs, self.niceness),
+        )
+
+    def _on_step(self):
+        if self.n_calls % self.eval_freq == 0:
+            self._submit()
+        self._collect()
+        return True
+
+    def _submit(self):
+        step = self.num_timesteps
+        if len(self._pending) >= self.max_pending:
+            if self.verbose:
+                print(f"Eval: {len(self._pending)} checkpoints still pending, skipping step {step}")
+            return
+        path = os.path.join(self.eval_dir, f"eval_{step}_steps.zip")
+        self.model.save(path)
+        futures = [
+            self._executor.submit(_evaluate_episode, type(self.model), path, self.eval_seed + i, self.deterministic)
+            for i in range(self.n_episodes)
+        ]
+        self._pending[step] = (path, futures)
+
+    def _collect(self, wait=False):
+        for step in list(self._pending):
+            path, futures = self._pending[step]
+            if not wait and not all(f.done() for f in futures):
+                continue
+            del self._pending[step]
+            try:
+                results = [f.result() for f in futures]
+            except Exception as e:
+                print(f"Eval of {path} failed: {e!r}")
+                continue
+            self._report(step, path, results)
+
+    def _report(self, step, path, results):
+        scores = np.array([score for score, _ in results], dtype=np.float64)
+        lengths = np.array([length for _, length in results], dtype=np.float64)
+        stats = {
+            "score_mean": scores.mean(),
+            "score_median": np.median(scores),
+            "score_std": scores.std(),
+            "score_min": scores.min(),
+            "score_max": scores.max(),
+            "length_mean": lengths.mean(),
+            "length_median": np.median(lengths),
+        }
+        for q in self.percentiles:
+            stats[f"score_p{q}"] = np.percentile(scores, q)
+        stats = {key: float(value) for key, value in stats.items()}
+
+        # the logger's TensorBoard writer takes an explicit step, so the
+        # curve lines up with the checkpoint rather than with when its
+        # evaluation happened to finish; other outputs get the values with
+        # the next dump
+        writers = [f.writer for f in self.logger.output_formats if isinstance(f, TensorBoardOutputFormat)]
+        for key, value in stats.items():
+            for writer in writers:
+                writer.add_scalar(f"eval/{key}", value, step)
+            self.logger.record(f"eval/{key}", value, exclude="tensorboard")
+        for writer in writers:
+            writer.flush()
+
+        with open(os.path.join(self.eval_dir, "evaluations.jsonl"), "a") as f:
+            f.write(json.dumps({"timesteps": step, "path": path, "episodes": len(results), **stats}) + "\n")
+        if self.verbose:
+            print(f"Eval at {step} steps: score {stats['score_mean']:.1f} mean, {stats['score_median']:.1f} median")
+
+    def _on_training_end(self):
+        if self._executor is None:
+            return
+        # training is over, so waiting here no longer holds up the learner
+        if self.wait_on_end:
+            self._collect(wait=True)
+        self._executor.shutdown(wait=self.wait_on_end, cancel_futures=not self.wait_on_end)
+        self._executor = None
@@ -0,0 +1,281 @@
+import os
+import argparse
+import glob
+import struct
+import time
+import zlib
+import multiprocessing as mp
+import numpy as np
+import gymnasium as gym
+
+from suika_env import SuikaEnv
+
+# Episode files (.skep) hold everything needed to rebuild an episode: the env
+# settings that change the physics, the reset seed, and per move the fruit in
+# hand and the action. The starting layout and the final score are kept too so
+# a replay can be checked, not just rerun.
+#
+# header: magic, version, flags, discrete_bins, max_fruits, settle_frames,
+#         settle_velocity, settle_angular_velocity, seed, score, fruits, moves,
+#         physics_hz, drop_substeps, solver_iterations (version 2 onwards)
+# body (zlib): layout float32 (fruits, 8), queue uint8 (moves),
+#              actions uint16 (discrete) or float32 (continuous) (moves)
+MAGIC = b"SKEP"
+VERSION = 2
+HEADER = struct.Struct("<4sBBHHHddQiHI")
+PHYSICS = struct.Struct("<dHH")
+# version 1 files were all recorded with the 60 Hz defaults
+V1_PHYSICS = (60.0, 120, 10)
+
+FLAG_CONTINUOUS = 1
+FLAG_RANDOM_START = 2
+FLAG_REBUILD = 4
+
+EXTENSION = ".skep"
+
+def save_episode(path, episode):
+    flags = 0
+    if episode["action_type"] != "discrete":
+        flags |= FLAG_CONTINUOUS
+    if episode["random_start"]:
+        flags |= FLAG_RANDOM_START
+    if episode["rebuild_each_step"]:
+        flags |= FLAG_REBUILD
+
+    action_dtype = np.uint16 if episode["action_type"] == "discrete" else np.float32
+    layout = np.asarray(episode["layout"], dtype=np.float32).reshape(-1, 8)
+    queue = np.asarray(episode["queue"], dtype=np.uint8)
+    actions = np.asarray(episode["actions"], dtype=action_dtype)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, flags,
+        episode["discrete_bins"], episode["max_fruits"], episode["settle_frames"],
+        episode["settle_velocity"], episode["settle_angular_velocity"],
+        episode["seed"], episode["score"], len(layout), len(actions),
+    ) + PHYSICS.pack(episode["physics_hz"], episode["drop_substeps"], episode["solver_iterations"])
+    body = zlib.compress(layout.tobytes() + queue.tobytes() + actions.tobytes(), 9)
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(body)
+
+def load_episode(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    (magic, version, flags, discrete_bins, max_fruits, settle_frames, settle_velocity,
+     settle_angular_velocity, seed, score, n_fruits, n_moves) = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} is not a version 1-{VERSION} episode file")
+
+    offset = HEADER.size
+    if version == 1:
+        physics_hz, drop_substeps, solver_iterations = V1_PHYSICS
+    else:
+        physics_hz, drop_substeps, solver_iterations = PHYSICS.unpack_from(data, offset)
+        offset += PHYSICS.size
+
+    action_dtype = np.float32 if flags & FLAG_CONTINUOUS else np.uint16
+    body = zlib.decompress(data[offset:])
+    layout_end = n_fruits * 8 * 4
+    queue_end = layout_end + n_moves
+
+    return {
+        "action_type": "continuous" if flags & FLAG_CONTINUOUS else "discrete",
+        "discrete_bins": discrete_bins,
+        "max_fruits": max_fruits,
+        "settle_frames": settle_frames,
+        "settle_velocity": settle_velocity,
+        "settle_angular_velocity": settle_angular_velocity,
+        "rebuild_each_step": bool(flags & FLAG_REBUILD),
+        "physics_hz": physics_hz,
+        "drop_substeps": drop_substeps,
+        "solver_iterations": solver_iterations,
+        "random_start": bool(flags & FLAG_RANDOM_START),
+        "seed": seed,
+        "score": score,
+        "layout": np.frombuffer(body[:layout_end], dtype=np.float32).reshape(n_fruits, 8),
+        "queue": np.frombuffer(body[layout_end:queue_end], dtype=np.uint8),
+        "actions": np.frombuffer(body[queue_end:], dtype=action_dtype),
+    }
+
+def env_kwargs(episode):
+    keys = ("action_type", "discrete_bins", "max_fruits", "settle_frames",
+            "settle_velocity", "settle_angular_velocity", "rebuild_each_step",
+            "physics_hz", "drop_substeps", "solver_iterations")
+    return {k: episode[k] for k in keys}
+
+class EpisodeRecorder(gym.Wrapper):
+    # Records every episode of a SuikaEnv. Resets without a seed get a fresh
+    # random one so the episode can still be rebuilt. With a directory each
+    # finished episode is written there as it ends.
+    def __init__(self, env, directory=None, prefix="episode"):
+        super().__init__(env)
+        suika = env.unwrapped
+        if suika.outcome_cache is not None:
+            raise ValueError("Cached drops are approximate, record without an outcome_cache")
+        if suika.start_pool is not None:
+            raise ValueError("Pooled starts are approximate, record without a start_pool")
+        if suika.reuse_space:
+            raise ValueError("A reused space carries state between episodes, record without reuse_space")
+        self.directory = directory
+        self.prefix = prefix
+        self.episode = None
+        self.saved = []
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reset(self, seed=None, options=None):
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2**63))
+        obs, info = self.env.reset(seed=seed, options=options)
+
+        suika = self.env.unwrapped
+        random_start = True
+        if options and "random_start" in options:
+            random_start = bool(options["random_start"])
+        self.episode = {
+            "action_type": suika.action_type,
+            "discrete_bins": suika.discrete_bins,
+            "max_fruits": suika.max_fruits,
+            "settle_frames": suika.settle_frames,
+            "settle_velocity": suika.settle_velocity,
+            "settle_angular_velocity": suika.settle_angular_velocity,
+            "rebuild_each_step": suika.rebuild_each_step,
+            "physics_hz": suika.physics_hz,
+            "drop_substeps": suika.drop_substeps,
+            "solver_iterations": suika.solver_iterations,
+            "random_start": random_start,
+            "seed": seed,
+            "score": 0,
+            "layout": suika._fruit_array(),
+            "queue": [],
+            "actions": [],
+        }
+        return obs, info
+
+    def step(self, action):
+        suika = self.env.unwrapped
+        self.episode["queue"].append(suika.cloud.curr.n)
+        if suika.action_type == "discrete":
+            self.episode["actions"].append(int(action))
+        else:
+            self.episode["actions"].append(float(np.asarray(action).reshape(-1)[0]))
+
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.episode["score"] = info["score"]
+        if (terminated or truncated) and self.directory:
+            self.save()
+        return obs, reward, terminated, truncated, info
+
+    def save(self, path=None):
+        if path is None:
+            name = f"{self.prefix}_{len(self.saved):06d}_{self.episode['seed']}{EXTENSION}"
+            path = os.path.join(self.directory, name)
+        save_episode(path, self.episode)
+        self.saved.append(path)
+        return path
+
+def replay_episode(episode, env=None, render=False):
+    # Rebuilds the episode move by move and reports the first divergence.
+    # Only the physics runs, no observations are built; render replays in a
+    # window at normal speed.
+    own_env = env is None
+    if own_env:
+        env = SuikaEnv(render_mode="human" if render else None, **env_kwargs(episode))
+
+    env.reset(seed=episode["seed"], options={"random_start": episode["random_start"]})
+    result = {"score": 0, "moves": 0, "ok": True, "error": None}
+
+    layout = env._fruit_array().astype(np.float32)
+    if not np.array_equal(layout, episode["layout"]):
+        result["ok"] = False
+        result["error"] = "starting layout differs"
+
+    continuous = episode["action_type"] != "discrete"
+    for n, action in zip(episode["queue"], episode["actions"]):
+        if not result["ok"]:
+            break
+        if env.cloud.curr.n != n:
+            result["ok"] = False
+            result["error"] = f"fruit queue differs at move {result['moves']}"
+            break
+        action = np.array([action], dtype=np.float32) if continuous else int(action)
+        _, terminated, _ = env._advance(action)
+        if terminated and not env.game_over:
+            # the replay window was closed
+            result["ok"] = False
+            result["error"] = "replay stopped"
+            break
+        result["moves"] += 1
+
+    result["score"] = env.handler.data["score"]
+    if result["ok"] and result["score"] != episode["score"]:
+        result["ok"] = False
+        result["error"] = f"score {result['score']} != recorded {episode['score']}"
+
+    if own_env:
+        env.close()
+    return result
+
+_worker_envs = {}
+
+def _verify(path):
+    # workers keep one env per distinct configuration across files
+    try:
+        episode = load_episode(path)
+    except (OSError, ValueError, zlib.error) as e:
+        return path, {"score": 0, "moves": 0, "ok": False, "error": str(e)}
+
+    kwargs = env_kwargs(episode)
+    key = tuple(sorted(kwargs.items()))
+    if key not in _worker_envs:
+        _worker_envs[key] = SuikaEnv(**kwargs)
+    return path, replay_episode(episode, env=_worker_envs[key])
+
+def verify(paths, workers):
+    start = time.perf_counter()
+    failed = 0
+    moves = 0
+    with mp.Pool(workers) as pool:
+        for path, result in pool.imap_unordered(_verify, paths):
+            moves += result["moves"]
+            if not result["ok"]:
+                failed += 1
+                print(f"FAIL {path}: {result['error']}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths) - failed}/{len(paths)} episodes reproduced exactly "
+          f"({moves} moves in {elapsed:.1f}s, {moves / max(elapsed, 1e-9):.0f} moves/sec)")
+    return failed == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and verify recorded Suika episodes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    replay = sub.add_parser("replay", help="Replay one episode file")
+    replay.add_argument("path", type=str, help="Episode file to replay")
+    replay.add_argument("--render", action="store_true", help="Show the game window while replaying")
+
+    check = sub.add_parser("verify", help="Resimulate every episode in a directory and compare scores")
+    check.add_argument("directory", type=str, help="Directory of episode files")
+    check.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of replay processes")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        episode = load_episode(args.path)
+        start = time.perf_counter()
+        result = replay_episode(episode, render=args.render)
+        elapsed = time.perf_counter() - start
+        status = "OK" if result["ok"] else f"FAIL ({result['error']})"
+        print(f"{status}: score {result['score']} (recorded {episode['score']}), "
+              f"{result['moves']} moves in {elapsed:.2f}s")
+        raise SystemExit(0 if result["ok"] else 1)
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*" + EXTENSION)))
+    if not paths:
+        print(f"No {EXTENSION} files in {args.directory}")
+        raise SystemExit(1)
+    raise SystemExit(0 if verify(paths, args.workers) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import os
+import argparse
+import json
+import time
+import multiprocessing as mp
+import numpy as np
+
+from worker_threads import limit_threads
+
+# Headless evaluation of a checkpoint over many seeded episodes. Worker
+# processes each run a few boards and only simulate; every tick the
+# observations of all live boards come back to this process and go through
+# the policy in one predict call. Episode i always starts from reset seed
+# seed + i, so two checkpoints evaluated with the same --seed and --episodes
+# play from identical starts and can be compared episode by episode.
+
+def run_boards(conn, seeds, boards, env_kwargs, random_start):
+    limit_threads(1)
+    from suika_env import SuikaEnv
+
+    seeds = list(seeds)
+    envs = [SuikaEnv(**env_kwargs) for _ in range(min(boards, len(seeds)))]
+    # slot -> [seed, moves] of the episode the board is playing
+    playing = {}
+    obs = {}
+
+    def start(slot):
+        seed = seeds.pop(0)
+        obs[slot], _ = envs[slot].reset(seed=seed, options={"random_start": random_start})
+        playing[slot] = [seed, 0]
+
+    for slot in range(len(envs)):
+        start(slot)
+
+    results = []
+    while playing:
+        slots = sorted(playing)
+        conn.send((slots, np.stack([obs[slot] for slot in slots]), results))
+        results = []
+        actions = conn.recv()
+        for slot, action in zip(slots, actions):
+            obs[slot], reward, terminated, truncated, info = envs[slot].step(action)
+            playing[slot][1] += 1
+            if terminated or truncated:
+                seed, moves = playing.pop(slot)
+                results.append({"seed": seed, "score": info["score"], "moves": moves})
+                if seeds:
+                    start(slot)
+    conn.send(([], None, results))
+    for env in envs:
+        env.close()
+    conn.close()
+
+def evaluate(model, seeds, workers, boards, env_kwargs, random_start=True, deterministic=True,
+             start_method="forkserver"):
+    ctx = mp.get_context(start_method)
+    conns = []
+    procs = []
+    for w in range(min(workers, len(seeds))):
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=run_boards, args=(child, seeds[w::workers], boards, env_kwargs, random_start),
+                           daemon=True)
+        proc.start()
+        child.close()
+        conns.append(parent)
+        procs.append(proc)
+
+    results = []
+    ticks = 0
+    batch_total = 0
+    live = list(conns)
+    while live:
+        # one observation batch per worker, one predict call for all of them
+        replies = [conn.recv() for conn in live]
+        for _, _, finished in replies:
+            results.extend(finished)
+        stepping = [(conn, slots, obs) for conn, (slots, obs, _) in zip(live, replies) if slots]
+        for conn, (slots, _, _) in zip(live, replies):
+            if not slots:
+                conn.close()
+        live = [conn for conn, _, _ in stepping]
+        if not stepping:
+            break
+
+        batch = np.concatenate([obs for _, _, obs in stepping])
+        actions, _ = model.predict(batch, deterministic=deterministic)
+        ticks += 1
+        batch_total += len(batch)
+        offset = 0
+        for conn, slots, _ in stepping:
+            conn.send(actions[offset:offset + len(slots)])
+            offset += len(slots)
+
+    for proc in procs:
+        proc.join()
+    results.sort(key=lambda r: r["seed"])
+    return results, {"ticks": ticks, "mean_batch": batch_total / max(ticks, 1)}
+
+def summarize(results, elapsed, percentiles=(5, 10, 25, 75, 90, 95)):
+    scores = np.array([r["score"] for r in results], dtype=np.float64)
+    moves = np.array([r["moves"] for r in results], dtype=np.float64)
+    summary = {
+        "episodes": len(results),
+        "score_mean": scores.mean(),
+        "score_std": scores.std(),
+        "score_median": np.median(scores),
+        "score_min": scores.min(),
+        "score_max": scores.max(),
+    }
+    for q in percentiles:
+        summary[f"score_p{q}"] = np.percentile(scores, q)
+    summary.update({
+        "moves_mean": moves.mean(),
+        "moves_median": np.median(moves),
+        "moves_min": moves.min(),
+        "moves_max": moves.max(),
+        "seconds": elapsed,
+        "episodes_per_sec": len(results) / elapsed,
+        "moves_per_sec": moves.sum() / elapsed,
+    })
+    return {key: float(value) for key, value in summary.items()}
+
+def compare(results, baseline):
+    # paired by seed, so only episodes both runs played are compared
+    base = {r["seed"]: r["score"] for r in baseline}
+    diffs = np.array([r["score"] - base[r["seed"]] for r in results if r["seed"] in base], dtype=np.float64)
+    if not len(diffs):
+        return None
+    return {
+        "paired_episodes": len(diffs),
+        "score_diff_mean": float(diffs.mean()),
+        # standard error of the paired mean difference
+        "score_diff_sem": float(diffs.std(ddof=1) / np.sqrt(len(diffs))) if len(diffs) > 1 else 0.0,
+        "wins": int((diffs > 0).sum()),
+        "ties": int((diffs == 0).sum()),
+        "losses": int((diffs < 0).sum()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a trained DQN model over many seeded headless episodes")
+    parser.add_argument("--model", type=str, required=True, help="Trained model zip, or its NumPy .npz export")
+    parser.add_argument("--episodes", type=int, default=1000, help="Number of episodes to run")
+    parser.add_argument("--seed", type=int, default=0, help="Episode i is reset with seed + i")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Simulation worker processes")
+    parser.add_argument("--boards", type=int, default=8, help="Boards per worker, batched into each predict call")
+    parser.add_argument("--stochastic", action="store_true", help="Sample actions instead of taking the greedy one")
+    parser.add_argument("--empty", action="store_true", help="Start with an empty board (no random fruits)")
+    parser.add_argument("--start-method", type=str, default="forkserver", choices=["fork", "forkserver"],
+                        help="Multiprocessing start method for the workers")
+    parser.add_argument("--output", type=str, default=None, help="Write the summary and per-episode results to this JSON file")
+    parser.add_argument("--compare", type=str, default=None,
+                        help="JSON from an earlier run to compare with, episode by episode")
+    args = parser.parse_args()
+
+    if not (os.path.exists(args.model) or os.path.exists(args.model + ".zip")):
+        print(f"Error: Model file '{args.model}' not found.")
+        return
+
+    from numpy_policy import load_policy
+    model = load_policy(args.model, device="cpu")
+
+    env_kwargs = {
+        'render_mode': None,
+        'action_type': 'discrete',
+        'discrete_bins': 128,
+        'max_fruits': 50,
+    }
+    seeds = list(range(args.seed, args.seed + args.episodes))
+
+    print(f"Evaluating {args.model} on {args.episodes} episodes "
+          f"({args.workers} workers x {args.boards} boards, seeds {args.seed}..{seeds[-1]})")
+    start = time.perf_counter()
+    results, batching = evaluate(model, seeds, args.workers, args.boards, env_kwargs,
+                                 random_start=not args.empty, deterministic=not args.stochastic,
+                                 start_method=args.start_method)
+    summary = summarize(results, time.perf_counter() - start)
+
+    print(f"Score:  mean {summary['score_mean']:.1f} ± {summary['score_std']:.1f}, median {summary['score_median']:.0f}, "
+          f"p10 {summary['score_p10']:.0f}, p90 {summary['score_p90']:.0f}, "
+          f"min {summary['score_min']:.0f}, max {summary['score_max']:.0f}")
+    print(f"Moves:  mean {summary['moves_mean']:.1f}, median {summary['moves_median']:.0f}, "
+          f"min {summary['moves_min']:.0f}, max {summary['moves_max']:.0f}")
+    print(f"Speed:  {summary['episodes_per_sec']:.2f} episodes/sec, {summary['moves_per_sec']:.0f} moves/sec, "
+          f"{batching['mean_batch']:.1f} observations per predict")
+
+    report = {
+        "model": args.model,
+        "seed": args.seed,
+        "deterministic": not args.stochastic,
+        "random_start": not args.empty,
+        "summary": summary,
+        "episodes": results,
+    }
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        paired = compare(results, baseline["episodes"])
+        if paired is None:
+            print(f"No episode seeds in common with {args.compare}")
+        else:
+            report["compare"] = dict(paired, baseline=args.compare)
+            print(f"Versus {baseline['model']}: {paired['score_diff_mean']:+.1f} ± {paired['score_diff_sem']:.1f} "
+                  f"score over {paired['paired_episodes']} paired episodes "
+                  f"({paired['wins']} better, {paired['ties']} equal, {paired['losses']} worse)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import argparse
+import json
+import mmap
+import time
+import zipfile
+import numpy as np
+
+# The trained DQN policy is a plain MLP over the observation vector
+# (209 -> 256 -> 256 -> 128 with ReLU), so acting greedily needs nothing but
+# a few matrix products. `export` pulls the online Q-network out of an SB3
+# zip into an uncompressed .npz, and NumpyPolicy runs it with NumPy alone,
+# without importing torch or stable_baselines3.
+#
+# .npz layout: w0, b0, w1, b1, ... float32, weights stored (in, out) so a
+# batch of observations is multiplied on the left, plus `meta` (a JSON
+# string array) with the layer count, activation and the model's
+# exploration rate.
+
+FORMAT_VERSION = 1
+
+def export(model_path, out_path):
+    # torch and SB3 are only needed here, to read the network out of the zip
+    from torch import nn
+    from stable_baselines3 import DQN
+    from stable_baselines3.common.torch_layers import FlattenExtractor
+
+    model = DQN.load(model_path, device="cpu")
+    if not isinstance(model.q_net.features_extractor, FlattenExtractor):
+        raise ValueError("Only Q-networks on flat observations can be exported")
+    arrays = {}
+    layers = 0
+    for module in model.q_net.q_net:
+        if isinstance(module, nn.Linear):
+            arrays[f"w{layers}"] = np.ascontiguousarray(module.weight.detach().numpy().T, dtype=np.float32)
+            arrays[f"b{layers}"] = module.bias.detach().numpy().astype(np.float32)
+            layers += 1
+        elif not isinstance(module, nn.ReLU):
+            raise ValueError(f"Only Linear/ReLU Q-networks can be exported, found {module}")
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "layers": layers,
+        "activation": "relu",
+        "exploration_rate": float(model.exploration_rate),
+        "source": os.path.basename(model_path),
+    }
+    # uncompressed, so every array can be memory-mapped straight from the file
+    np.savez(out_path, meta=np.array(json.dumps(meta)), **arrays)
+    return out_path if out_path.endswith(".npz") else out_path + ".npz"
+
+def _mmap_npz(path):
+    # np.load ignores mmap_mode for .npz, but the members of an uncompressed
+    # archive are plain .npy files at fixed offsets, so map those directly
+    arrays = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as z:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        for info in z.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed, re-export it with numpy_policy.py export")
+            # local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"{path} holds object arrays")
+            count = int(np.prod(shape))
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=f.tell())
+            arrays[name] = array.reshape(shape, order="F" if fortran else "C")
+    return arrays
+
+class NumpyPolicy:
+    # Q-network policy. predict() follows SB3's signature and return shape so
+    # it can stand in for model.predict: one observation gives one action, a
+    # (n, obs_dim) batch gives n actions.
+    def __init__(self, path, mmap=True, seed=None):
+        arrays = _mmap_npz(path) if mmap else dict(np.load(path))
+        meta = json.loads(str(arrays.pop("meta")[()]))
+        if meta["version"] > FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {meta['version']}, newer than {FORMAT_VERSION}")
+        self.path = path
+        self.weights = [arrays[f"w{i}"] for i in range(meta["layers"])]
+        self.biases = [arrays[f"b{i}"] for i in range(meta["layers"])]
+        self.obs_dim = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+        # exports written before the rate was stored can only act greedily
+        self.exploration_rate = meta.get("exploration_rate")
+        self.rng = np.random.default_rng(seed)
+
+    def q_values(self, obs):
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim)
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight
+            x += bias
+            if i < last:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        obs = np.asarray(obs)
+        actions = self.q_values(obs).argmax(axis=1)
+        if not deterministic:
+            # SB3's DQN samples epsilon-greedy with the model's final
+            # exploration rate; here each observation explores on its own
+            if self.exploration_rate is None:
+                raise ValueError(f"{self.path} has no exploration rate, re-export it to act stochastically")
+            explore = self.rng.random(len(actions)) < self.exploration_rate
+            actions[explore] = self.rng.integers(self.n_actions, size=int(explore.sum()))
+        if obs.ndim == 1:
+            actions = actions[0]
+        return actions, state
+
+def load_policy(path, **kwargs):
+    # .npz exports run on NumPy, anything else is loaded as an SB3 DQN zip
+    if path.endswith(".npz"):
+        return NumpyPolicy(path)
+    from stable_baselines3 import DQN
+    return DQN.load(path, **kwargs)
+
+def _observations(n, seed):
+    # real observations from seeded random play, so the comparison covers
+    # the states the policy actually sees, plus uniform noise in the box
+    from suika_env import SuikaEnv
+    env = SuikaEnv(action_type="discrete", discrete_bins=128, max_fruits=50)
+    rng = np.random.default_rng(seed)
+    obs_list = []
+    obs, _ = env.reset(seed=seed)
+    while len(obs_list) < n // 2:
+        obs_list.append(obs)
+        obs, _, terminated, truncated, _ = env.step(rng.integers(env.action_space.n))
+        if terminated or truncated:
+            obs, _ = env.reset(seed=int(rng.integers(2 ** 31)))
+    space = env.observation_space
+    env.close()
+    noise = rng.uniform(space.low, space.high, (n - len(obs_list), space.shape[0])).astype(np.float32)
+    return np.concatenate([np.stack(obs_list), noise])
+
+def check(model_path, npz_path, n, seed, atol):
+    import torch
+    from stable_baselines3 import DQN
+
+    model = DQN.load(model_path, device="cpu")
+    policy = NumpyPolicy(npz_path)
+    obs = _observations(n, seed)
+    with torch.no_grad():
+        expected = model.q_net(torch.as_tensor(obs)).numpy()
+    q = policy.q_values(obs)
+    error = float(np.abs(q - expected).max())
+
+    sb3_actions, _ = model.predict(obs, deterministic=True)
+    actions, _ = policy.predict(obs)
+    mismatched = np.flatnonzero(actions != sb3_actions)
+    # a different argmax is only acceptable when the two best Q-values are
+    # within float rounding of each other
+    top2 = np.sort(expected[mismatched], axis=1)[:, -2:]
+    real = int(np.sum(top2[:, 1] - top2[:, 0] > atol))
+
+    print(f"{n} observations: max |dQ| {error:.2e}, {len(mismatched)} differing actions ({real} beyond ties)")
+    return error <= atol and real == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a DQN zip to a NumPy policy and check it matches")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Write the Q-network weights of an SB3 DQN zip to an .npz")
+    exp.add_argument("model", type=str, help="SB3 DQN zip")
+    exp.add_argument("output", type=str, nargs="?", default=None, help="Output .npz (default: next to the zip)")
+
+    chk = sub.add_parser("check", help="Compare an export's Q-values and greedy actions with the SB3 model")
+    chk.add_argument("model", type=str, help="SB3 DQN zip")
+    chk.add_argument("npz", type=str, help="Exported .npz")
+    chk.add_argument("--observations", type=int, default=4000, help="Observations to compare on")
+    chk.add_argument("--seed", type=int, default=0, help="Seed for the random play and noise")
+    chk.add_argument("--atol", type=float, default=1e-4, help="Largest Q-value difference allowed")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        output = args.output or os.path.splitext(args.model)[0] + ".npz"
+        start = time.perf_counter()
+        path = export(args.model, output)
+        policy = NumpyPolicy(path)
+        sizes = " -> ".join(str(w.shape[0]) for w in policy.weights) + f" -> {policy.n_actions}"
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.2f} MB, {sizes}) in {time.perf_counter() - start:.2f}s")
+        return
+
+    ok = check(args.model, args.npz, args.observations, args.seed, args.atol)
+    print("OK" if ok else "MISMATCH")
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
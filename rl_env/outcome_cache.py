@@ -0,0 +1,98 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# rough per-entry cost of the dict, key and bookkeeping on top of the arrays
+ENTRY_OVERHEAD = 400
+
+class OutcomeCache:
+    # LRU cache of simulated drops. The key is a hash of the board before the
+    # drop with positions, angles and the game-over timer rounded to the given
+    # tolerances, plus the current/next fruit and the drop x. The value is the
+    # board after the drop and the score it earned.
+    def __init__(self, max_entries=100000, max_bytes=512 * 1024 * 1024,
+                 position_tol=0.5, angle_tol=0.05, timer_tol=1/60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.position_tol = position_tol
+        self.angle_tol = angle_tol
+        self.timer_tol = timer_tol
+        # the physics settings of the env that filled the cache
+        self.settings = None
+
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, fruits, curr_n, drop_x, next_n, game_over_timer):
+        # fruits rows are (n, x, y, vx, vy, angle, angular_velocity, has_collided)
+        board = np.empty((len(fruits), 5), dtype=np.int64)
+        board[:, 0] = fruits[:, 0]
+        board[:, 1:3] = np.round(fruits[:, 1:3] / self.position_tol)
+        board[:, 3] = np.round(fruits[:, 5] / self.angle_tol)
+        board[:, 4] = fruits[:, 7]
+        # the registry order depends on merge history, so sort the rows
+        board = board[np.lexsort(board.T[::-1])]
+
+        header = np.array([
+            curr_n, next_n,
+            round(drop_x / self.position_tol),
+            round(game_over_timer / self.timer_tol),
+        ], dtype=np.int64)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(header.tobytes())
+        digest.update(board.tobytes())
+        return digest.digest()
+
+    def bind(self, settings):
+        # outcomes only hold for the settings they were simulated with, so a
+        # cache serves one configuration
+        if self.settings is None:
+            self.settings = dict(settings)
+        elif self.settings != settings:
+            raise ValueError(f"Outcome cache holds drops simulated with {self.settings}, the env runs {settings}")
+
+    def get(self, key):
+        outcome = self._entries.get(key)
+        if outcome is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return outcome
+
+    def put(self, key, outcome):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = outcome
+        self.nbytes += self._size(outcome)
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= self._size(old)
+            self.evictions += 1
+
+    def _size(self, outcome):
+        return outcome["fruits"].nbytes + ENTRY_OVERHEAD
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
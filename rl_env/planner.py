@@ -0,0 +1,194 @@
+import os
+import argparse
+import time
+import multiprocessing as mp
+import numpy as np
+
+from suika_env import SuikaEnv
+from outcome_cache import OutcomeCache
+
+_worker_env = None
+
+def _init_worker(env_kwargs, cache_entries):
+    global _worker_env
+    if cache_entries:
+        env_kwargs = dict(env_kwargs, outcome_cache=OutcomeCache(max_entries=cache_entries))
+    _worker_env = SuikaEnv(**env_kwargs)
+
+def _simulate(state, action):
+    # set_state rebuilds the board, so every simulation of a state steps
+    # the same fresh space
+    _worker_env.set_state(state)
+    score_before = _worker_env.handler.data["score"]
+    _worker_env._advance(action)
+    gain = _worker_env.handler.data["score"] - score_before
+    # obs[8] is the top of the highest fruit over the screen height, so a
+    # larger value means a lower stack
+    height = _worker_env._get_obs()[8]
+    return gain, height, _worker_env.game_over
+
+def _evaluate(task):
+    state, action, second_actions, weights = task
+    gain, height, over = _simulate(state, action)
+    value = _value(gain, height, over, weights)
+    if over or not second_actions:
+        return value
+
+    # second ply: the fruit in hand is the cloud's known next fruit
+    after = _worker_env.get_state()
+    best = max(
+        _value(*_simulate(after, second), weights)
+        for second in second_actions
+    )
+    return value + weights["discount"] * best
+
+def _value(gain, height, over, weights):
+    return gain + weights["height"] * height - weights["game_over"] * over
+
+def spaced_actions(n_bins, count):
+    if count is None or count >= n_bins:
+        return list(range(n_bins))
+    return sorted(set(np.linspace(0, n_bins - 1, count).round().astype(int).tolist()))
+
+class LookaheadPlanner:
+    def __init__(self, processes=None, discrete_bins=128, max_fruits=50, candidates=None,
+                 depth=1, second_candidates=16, height_weight=50.0, game_over_penalty=1000.0,
+                 discount=0.9, cache_entries=0):
+        self.processes = processes or os.cpu_count()
+        self.env_kwargs = {
+            'render_mode': None,
+            'action_type': 'discrete',
+            'discrete_bins': discrete_bins,
+            'max_fruits': max_fruits,
+        }
+        self.actions = spaced_actions(discrete_bins, candidates)
+        self.second_actions = spaced_actions(discrete_bins, second_candidates) if depth >= 2 else []
+        self.weights = {
+            'height': height_weight,
+            'game_over': game_over_penalty,
+            'discount': discount,
+        }
+        # Workers build their env once and are reused for every move
+        self.pool = mp.Pool(self.processes, initializer=_init_worker, initargs=(self.env_kwargs, cache_entries))
+
+    def choose(self, env):
+        state = env.get_state()
+        tasks = [(state, a, self.second_actions, self.weights) for a in self.actions]
+        chunksize = max(1, len(tasks) // (self.processes * 4))
+        values = self.pool.map(_evaluate, tasks, chunksize=chunksize)
+        return self.actions[int(np.argmax(values))]
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+def play(planner, env, episodes, random_start=True, seed=None):
+    moves = 0
+    start = time.perf_counter()
+    for ep in range(episodes):
+        ep_seed = None if seed is None else seed + ep
+        obs, info = env.reset(seed=ep_seed, options={"random_start": random_start})
+        done = False
+        truncated = False
+        step = 0
+
+        print(f"Episode {ep+1} started.")
+
+        while not (done or truncated):
+            action = planner.choose(env)
+            obs, reward, done, truncated, info = env.step(action)
+            step += 1
+
+        moves += step
+        print(f"Episode {ep+1} finished. Score: {info['score']}, Moves: {step}")
+
+    elapsed = time.perf_counter() - start
+    print(f"{moves} moves in {elapsed:.1f}s ({moves / elapsed:.2f} moves/sec)")
+
+def benchmark(args, planner_kwargs):
+    env = SuikaEnv(action_type='discrete', discrete_bins=args.bins, rebuild_each_step=True)
+    seed = args.seed or 0
+    env.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    # play a few moves so the benchmark board is not empty, then keep one
+    # distinct board per timed move (plus one to warm up on), so an outcome
+    # cache only helps as much as it would in a real game
+    for action in rng.integers(0, args.bins, 10):
+        env.step(action)
+    states = []
+    while len(states) < args.bench_moves + 1:
+        states.append(env.get_state())
+        _, _, terminated, _, _ = env.step(rng.integers(args.bins))
+        if terminated:
+            env.reset(seed=int(rng.integers(2 ** 31)))
+
+    counts = [1]
+    while counts[-1] * 2 <= args.workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.workers:
+        counts.append(args.workers)
+
+    print(f"{'workers':>7} {'moves/sec':>10} {'speedup':>8} {'efficiency':>10}")
+    base = None
+    for n in counts:
+        planner = LookaheadPlanner(processes=n, **planner_kwargs)
+        env.set_state(states[0])
+        planner.choose(env)
+        start = time.perf_counter()
+        for state in states[1:]:
+            env.set_state(state)
+            planner.choose(env)
+        rate = args.bench_moves / (time.perf_counter() - start)
+        planner.close()
+
+        base = base or rate
+        speedup = rate / base
+        print(f"{n:>7} {rate:>10.2f} {speedup:>7.2f}x {speedup / n:>9.0%}")
+
+    env.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Play with a parallel lookahead planner")
+    parser.add_argument("--episodes", type=int, default=1, help="Number of episodes to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of simulation worker processes")
+    parser.add_argument("--bins", type=int, default=128, help="Number of discrete drop positions")
+    parser.add_argument("--candidates", type=int, default=None, help="Evaluate only N evenly spaced drop positions")
+    parser.add_argument("--depth", type=int, default=1, choices=[1, 2], help="Search depth, 2 also plans the known next fruit")
+    parser.add_argument("--second-candidates", type=int, default=16, help="Drop positions tried for the second fruit")
+    parser.add_argument("--cache-entries", type=int, default=0,
+                        help="Per-worker outcome cache size, repeated (board, drop) pairs skip the physics")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the first episode, incremented per episode")
+    parser.add_argument("--empty", action="store_true", help="Start with an empty board (no random fruits)")
+    parser.add_argument("--render", action="store_true", help="Show the game window while playing")
+    parser.add_argument("--bench", action="store_true", help="Measure moves/sec and scaling from 1 to --workers processes")
+    parser.add_argument("--bench-moves", type=int, default=10, help="Moves timed per worker count in --bench")
+    args = parser.parse_args()
+
+    planner_kwargs = {
+        'discrete_bins': args.bins,
+        'candidates': args.candidates,
+        'depth': args.depth,
+        'second_candidates': args.second_candidates,
+        'cache_entries': args.cache_entries,
+    }
+
+    if args.bench:
+        benchmark(args, planner_kwargs)
+        return
+
+    env = SuikaEnv(
+        render_mode='human' if args.render else None,
+        action_type='discrete',
+        discrete_bins=args.bins,
+        rebuild_each_step=True,
+    )
+    planner = LookaheadPlanner(processes=args.workers, **planner_kwargs)
+
+    try:
+        play(planner, env, args.episodes, random_start=not args.empty, seed=args.seed)
+    finally:
+        planner.close()
+        env.close()
+
+if __name__ == "__main__":
+    main()
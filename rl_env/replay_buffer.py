@@ -0,0 +1,139 @@
+import numpy as np
+import torch as th
+from gymnasium import spaces
+from stable_baselines3.common.buffers import BaseBuffer, ReplayBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+OBS_DTYPES = ("float16", "uint8")
+
+class QuantizedReplayBuffer(ReplayBuffer):
+    # ReplayBuffer for Box observations bounded to [low, high] (the env's are
+    # all [0, 1]) that stores them as float16 or as uint8 steps of
+    # (high - low) / 255 and dequantizes to float32 when a batch is sampled.
+    #
+    # Like SB3's optimize_memory_usage, next_obs is not stored separately:
+    # it is the obs of the following row. The exception is the terminal
+    # observation of a finished episode, which the auto-reset replaces in
+    # the next row, so those few rows are kept on the side. Unlike SB3's
+    # variant this still works with handle_timeout_termination.
+    def __init__(self, buffer_size, observation_space, action_space, device="auto", n_envs=1,
+                 optimize_memory_usage=False, handle_timeout_termination=True, obs_dtype="uint8"):
+        if not isinstance(observation_space, spaces.Box):
+            raise ValueError("QuantizedReplayBuffer needs a Box observation space")
+        if obs_dtype not in OBS_DTYPES:
+            raise ValueError(f"obs_dtype must be one of {OBS_DTYPES}, got {obs_dtype!r}")
+        BaseBuffer.__init__(self, buffer_size, observation_space, action_space, device, n_envs=n_envs)
+
+        self.buffer_size = max(buffer_size // n_envs, 1)
+        # only kept for SB3 code that reads the flag; next_obs is always implicit
+        self.optimize_memory_usage = optimize_memory_usage
+        self.handle_timeout_termination = handle_timeout_termination
+        self.obs_dtype = np.dtype(obs_dtype)
+
+        low = np.broadcast_to(observation_space.low, self.obs_shape).astype(np.float32)
+        high = np.broadcast_to(observation_space.high, self.obs_shape).astype(np.float32)
+        if not (np.all(np.isfinite(low)) and np.all(np.isfinite(high))):
+            raise ValueError("QuantizedReplayBuffer needs finite observation bounds")
+        self.obs_low = low
+        self.obs_high = high
+        self.obs_step = (high - low) / 255.0
+        self._inv_step = np.float32(1.0) / np.maximum(self.obs_step, np.finfo(np.float32).tiny)
+        self._low_t = th.as_tensor(low, device=self.device)
+        self._step_t = th.as_tensor(self.obs_step, device=self.device)
+
+        self.observations = np.zeros((self.buffer_size, self.n_envs, *self.obs_shape), dtype=self.obs_dtype)
+        self.actions = np.zeros(
+            (self.buffer_size, self.n_envs, self.action_dim), dtype=self._maybe_cast_dtype(action_space.dtype)
+        )
+        self.rewards = np.zeros((self.buffer_size, self.n_envs), dtype=np.float32)
+        self.dones = np.zeros((self.buffer_size, self.n_envs), dtype=np.float32)
+        self.timeouts = np.zeros((self.buffer_size, self.n_envs), dtype=np.float32)
+        # (row, env) -> quantized terminal observation
+        self.final_observations = {}
+
+    def quantize(self, obs):
+        obs = np.asarray(obs, dtype=np.float32)
+        if self.obs_dtype == np.uint8:
+            scaled = (obs - self.obs_low) * self._inv_step
+            return np.rint(np.clip(scaled, 0, 255, out=scaled), out=scaled).astype(np.uint8)
+        return obs.astype(np.float16)
+
+    def dequantize(self, obs):
+        if self.obs_dtype == np.uint8:
+            return obs.astype(np.float32) * self.obs_step + self.obs_low
+        return obs.astype(np.float32)
+
+    @property
+    def nbytes(self):
+        arrays = (self.observations, self.actions, self.rewards, self.dones, self.timeouts)
+        return sum(a.nbytes for a in arrays) + sum(o.nbytes for o in self.final_observations.values())
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        action = np.asarray(action).reshape((self.n_envs, self.action_dim))
+        obs = self.quantize(obs).reshape((self.n_envs, *self.obs_shape))
+        next_obs = self.quantize(next_obs).reshape((self.n_envs, *self.obs_shape))
+        done = np.asarray(done).reshape(self.n_envs)
+
+        self.observations[self.pos] = obs
+        self.observations[(self.pos + 1) % self.buffer_size] = next_obs
+
+        for env_idx in range(self.n_envs):
+            self.final_observations.pop((self.pos, env_idx), None)
+            if done[env_idx]:
+                self.final_observations[(self.pos, env_idx)] = next_obs[env_idx].copy()
+
+        self.actions[self.pos] = action
+        self.rewards[self.pos] = np.asarray(reward)
+        self.dones[self.pos] = done
+
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = np.array([info.get("TimeLimit.truncated", False) for info in infos])
+
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def sample(self, batch_size, env=None):
+        # row `pos` only holds the newest next_obs once the buffer is full
+        if self.full:
+            batch_inds = (np.random.randint(1, self.buffer_size, size=batch_size) + self.pos) % self.buffer_size
+        else:
+            batch_inds = np.random.randint(0, self.pos, size=batch_size)
+        return self._get_samples(batch_inds, env=env)
+
+    def _get_samples(self, batch_inds, env=None):
+        env_indices = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+        batch_size = len(batch_inds)
+
+        # obs and next_obs rows in one gather and one conversion
+        rows = np.concatenate([batch_inds, (batch_inds + 1) % self.buffer_size])
+        obs = self.observations[rows, np.concatenate([env_indices, env_indices])]
+        dones = self.dones[batch_inds, env_indices]
+        for k in np.flatnonzero(dones):
+            final = self.final_observations.get((batch_inds[k], env_indices[k]))
+            if final is not None:
+                obs[batch_size + k] = final
+        obs = self._obs_to_torch(obs, env)
+
+        data = (
+            self.actions[batch_inds, env_indices, :],
+            (dones * (1 - self.timeouts[batch_inds, env_indices])).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env),
+        )
+        actions, dones, rewards = map(self.to_torch, data)
+        return ReplayBufferSamples(obs[:batch_size], actions, obs[batch_size:], dones, rewards)
+
+    def _obs_to_torch(self, obs, env):
+        if env is not None:
+            # VecNormalize works on NumPy arrays
+            return self.to_torch(self._normalize_obs(self.dequantize(obs), env))
+        # torch widens float16 several times faster than NumPy
+        tensor = th.from_numpy(obs).to(self.device).float()
+        if self.obs_dtype == np.uint8:
+            tensor.mul_(self._step_t).add_(self._low_t)
+        return tensor
+
+    def reset(self):
+        super().reset()
+        self.final_observations.clear()
@@ -0,0 +1,149 @@
+import os
+import argparse
+import json
+import time
+import multiprocessing as mp
+import numpy as np
+
+# A random start drops 3-8 fruits and simulates half a second after each,
+# which is most of the cost of a reset. A start pool holds boards settled
+# ahead of time: board i is the random start SuikaEnv makes for seed i, and
+# SuikaEnv(start_pool=...) rebuilds that board from the stored state instead
+# of simulating it. Seeds past the end of the pool are simulated as usual.
+# Boards are restored without pymunk's
+# contact cache, so play from them is close to, not bit-identical with, the
+# live start of the same seed.
+#
+# .npz layout: counts uint8 (boards), types uint8 (fruits), collided bool
+# (fruits), state float32 (fruits, 6): x, y, vx, vy, angle, angular
+# velocity; plus meta (a JSON string) with the physics settings they were
+# settled with.
+
+FORMAT_VERSION = 1
+
+def settle_boards(task):
+    from suika_env import SuikaEnv
+    seeds, env_kwargs = task
+    env = SuikaEnv(**env_kwargs)
+    boards = []
+    for seed in seeds:
+        env._reset_board(int(seed), {"random_start": True})
+        boards.append(env._fruit_array())
+    env.close()
+    return boards
+
+def build(count, workers=1, chunk=500, physics_hz=None, solver_iterations=None, verbose=False):
+    env_kwargs = {"physics_hz": physics_hz, "solver_iterations": solver_iterations}
+    tasks = [(range(start, min(start + chunk, count)), env_kwargs) for start in range(0, count, chunk)]
+    boards = []
+    start = time.perf_counter()
+    if workers > 1:
+        pool = mp.get_context("forkserver").Pool(workers)
+        chunks = pool.imap(settle_boards, tasks)
+    else:
+        pool = None
+        chunks = map(settle_boards, tasks)
+    for chunk_boards in chunks:
+        boards.extend(chunk_boards)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"{len(boards)}/{count} boards ({len(boards) / elapsed:.0f}/s)", end="\r", flush=True)
+    if pool is not None:
+        pool.close()
+        pool.join()
+    if verbose:
+        print()
+
+    # suika_env puts the project root on sys.path for the game package
+    from suika_env import config
+    meta = {
+        "version": FORMAT_VERSION,
+        "physics_hz": physics_hz or config.physics.hz,
+        "solver_iterations": solver_iterations or config.physics.iterations,
+    }
+    return StartPool.from_boards(boards, meta)
+
+class StartPool:
+    def __init__(self, counts, types, collided, state, meta):
+        self.counts = counts
+        self.types = types
+        self.collided = collided
+        self.state = state
+        self.meta = meta
+        self.offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+
+    @classmethod
+    def from_boards(cls, boards, meta):
+        # boards as returned by SuikaEnv._fruit_array()
+        fruits = np.concatenate(boards) if boards else np.zeros((0, 8))
+        return cls(
+            np.array([len(b) for b in boards], dtype=np.uint8),
+            fruits[:, 0].astype(np.uint8),
+            fruits[:, 7].astype(bool),
+            fruits[:, 1:7].astype(np.float32),
+            meta,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"][()]))
+            if meta["version"] > FORMAT_VERSION:
+                raise ValueError(f"{path} has format version {meta['version']}, newer than {FORMAT_VERSION}")
+            return cls(data["counts"], data["types"], data["collided"], data["state"], meta)
+
+    def save(self, path):
+        np.savez(path, meta=np.array(json.dumps(self.meta)), counts=self.counts,
+                 types=self.types, collided=self.collided, state=self.state)
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes + self.types.nbytes + self.collided.nbytes + self.state.nbytes
+
+    def index(self, seed, np_random):
+        # a seeded reset gets its own board, or None when the pool does not
+        # hold it; unseeded ones draw from the env's generator
+        if seed is None:
+            return int(np_random.integers(len(self)))
+        if 0 <= seed < len(self):
+            return seed
+        return None
+
+    def board(self, index):
+        # one (n, 8) row per fruit, in the layout of SuikaEnv._fruit_array()
+        lo, hi = self.offsets[index], self.offsets[index + 1]
+        fruits = np.empty((hi - lo, 8), dtype=np.float64)
+        fruits[:, 0] = self.types[lo:hi]
+        fruits[:, 1:7] = self.state[lo:hi]
+        fruits[:, 7] = self.collided[lo:hi]
+        return fruits
+
+    def check_physics(self, physics_hz, solver_iterations):
+        if (self.meta["physics_hz"], self.meta["solver_iterations"]) != (physics_hz, solver_iterations):
+            raise ValueError(
+                f"Start pool was settled at {self.meta['physics_hz']} Hz / {self.meta['solver_iterations']} "
+                f"iterations, the env runs {physics_hz} Hz / {solver_iterations}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a pool of pre-settled random-start boards")
+    parser.add_argument("output", type=str, help="Output .npz")
+    parser.add_argument("--count", type=int, default=100000, help="Boards in the pool (board i is seed i's start)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes settling boards")
+    parser.add_argument("--physics-hz", type=float, default=None, help="Physics rate the env will run at")
+    parser.add_argument("--solver-iterations", type=int, default=None, help="Solver iterations the env will run with")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pool = build(args.count, args.workers, physics_hz=args.physics_hz,
+                 solver_iterations=args.solver_iterations, verbose=True)
+    pool.save(args.output)
+    print(f"Wrote {len(pool)} boards ({pool.offsets[-1]} fruits, {pool.nbytes / 1e6:.1f} MB) to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from suika_env import SuikaEnv
+
+
+# Steps num_envs independent boards (one pymunk Space each) in lockstep inside
+# one process, writing every observation into a single preallocated array.
+class SuikaVecEnv(VecEnv):
+    def __init__(self, num_envs, **env_kwargs):
+        self.envs = [SuikaEnv(**env_kwargs) for _ in range(num_envs)]
+        env = self.envs[0]
+        super().__init__(num_envs, env.observation_space, env.action_space)
+        self.metadata = env.metadata
+
+        self.buf_obs = np.zeros((num_envs, *env.observation_space.shape), dtype=np.float32)
+        self.buf_rews = np.zeros((num_envs,), dtype=np.float32)
+        self.buf_dones = np.zeros((num_envs,), dtype=bool)
+        self.buf_infos = [{} for _ in range(num_envs)]
+        self.actions = None
+
+    def reset(self):
+        for env_idx, env in enumerate(self.envs):
+            self._reset_env(env_idx, seed=self._seeds[env_idx], options=self._options[env_idx])
+        self._reset_seeds()
+        self._reset_options()
+        # The learner keeps the returned array as its last observation while
+        # the next step is written, so hand out a copy of the shared buffer.
+        return self.buf_obs.copy()
+
+    def _reset_env(self, env_idx, seed=None, options=None):
+        env = self.envs[env_idx]
+        gym.Env.reset(env, seed=seed)
+        env._reset_board(seed, options or None)
+        env._observe(out=self.buf_obs[env_idx])
+        self.reset_infos[env_idx] = env._get_info()
+
+    def step_async(self, actions):
+        self.actions = actions
+
+    def step_wait(self):
+        for env_idx, env in enumerate(self.envs):
+            reward, terminated, truncated = env._advance(self.actions[env_idx])
+            self.buf_rews[env_idx] = reward
+            self.buf_dones[env_idx] = terminated or truncated
+
+            env._observe(out=self.buf_obs[env_idx])
+            info = env._get_info()
+            info["TimeLimit.truncated"] = truncated and not terminated
+
+            if self.buf_dones[env_idx]:
+                info["terminal_observation"] = self.buf_obs[env_idx].copy()
+                # its reset time goes out with the env's next step
+                self._reset_env(env_idx)
+            self.buf_infos[env_idx] = info
+
+        return self.buf_obs.copy(), self.buf_rews.copy(), self.buf_dones.copy(), list(self.buf_infos)
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.envs[i], attr_name) for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        for i in self._get_indices(indices):
+            setattr(self.envs[i], attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [
+            getattr(self.envs[i], method_name)(*method_args, **method_kwargs)
+            for i in self._get_indices(indices)
+        ]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -1,19 +1,25 @@
 import os
 import argparse
 import gymnasium as gym
-from stable_baselines3 import DQN
-from stable_baselines3.common.env_util import make_vec_env
 import time
 
 from suika_env import SuikaEnv
+from suika.part2.config import config
+from suika.part2.recorder import VideoRecorder
+from episodes import EpisodeRecorder
+from numpy_policy import load_policy
 
 def main():
     parser = argparse.ArgumentParser(description="Test a trained DQN model")
-    parser.add_argument("--model", type=str, required=True, help="Path to the trained model zip file")
+    parser.add_argument("--model", type=str, required=True, help="Trained model zip, or its NumPy .npz export (loads without torch)")
     parser.add_argument("--episodes", type=int, default=1, help="Number of episodes to run")
     parser.add_argument("--fps", type=int, default=60, help="Target FPS for viewing")
     parser.add_argument("--stochastic", action="store_true", help="Use stochastic (random) actions instead of deterministic")
     parser.add_argument("--empty", action="store_true", help="Start with an empty board (no random fruits)")
+    parser.add_argument("--record", type=str, default=None, help="Save a video of the run to this .mp4 path")
+    parser.add_argument("--record-skip", type=int, default=2, help="Record every Nth physics frame")
+    parser.add_argument("--headless", action="store_true", help="Run without a window (useful with --record)")
+    parser.add_argument("--save-episodes", type=str, default=None, help="Archive each episode as a replayable .skep file in this directory")
     args = parser.parse_args()
 
     model_path = args.model
@@ -24,15 +30,28 @@ def main():
     print(f"Loading model from {model_path}...")
 
     env_kwargs = {
-        'render_mode': 'human',
+        'render_mode': None if args.headless else 'human',
         'action_type': 'discrete',
         'discrete_bins': 128, 
         'max_fruits': 50
     }
     
+    recorder = None
+    if args.record:
+        recorder = VideoRecorder(
+            args.record,
+            config.screen.fps,
+            (config.screen.width, config.screen.height),
+            frame_skip=args.record_skip,
+            block=args.headless,
+        )
+        env_kwargs['recorder'] = recorder
+    
     env = SuikaEnv(**env_kwargs)
+    if args.save_episodes:
+        env = EpisodeRecorder(env, directory=args.save_episodes)
     
-    model = DQN.load(model_path, env=env)
+    model = load_policy(model_path, env=env)
 
     print(f"Starting testing... (Deterministic: {not args.stochastic})")
     
@@ -53,6 +72,8 @@ def main():
             total_reward += reward
             step += 1
             
+            if args.headless:
+                continue
             time.sleep(1.0 / args.fps)
             
             import pygame
@@ -63,6 +84,9 @@ def main():
         
         print(f"Episode {ep+1} finished. Score: {info['score']}, Total Reward: {total_reward}")
 
+    if recorder is not None:
+        stats = recorder.close()
+        print(f"Saved {stats['written']} frames to {args.record} ({stats['dropped']} dropped)")
     env.close()
 
 if __name__ == "__main__":
@@ -3,13 +3,47 @@ import argparse
 import gymnasium as gym
 from stable_baselines3 import DQN
 from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.callbacks import CheckpointCallback
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecMonitor
+from stable_baselines3.common.type_aliases import TrainFreq, TrainFrequencyUnit
+from stable_baselines3.common.callbacks import CallbackList, CheckpointCallback
 
 from suika_env import SuikaEnv
+from suika_vec_env import SuikaVecEnv
+from replay_buffer import QuantizedReplayBuffer
+from callbacks import AsyncEvalCallback, StepTimingCallback
+from worker_threads import worker_thread_env
+
+def make_worker_env(worker_threads=1, **env_kwargs):
+    import torch
+    torch.set_num_threads(worker_threads)
+    return SuikaEnv(**env_kwargs)
 
 def main():
     parser = argparse.ArgumentParser(description="Train DQN agent")
     parser.add_argument("--model", type=str, help="Path to existing model to continue training (optional)")
+    parser.add_argument("--n-envs", type=int, default=1, help="Number of environments to simulate in parallel")
+    parser.add_argument("--seed", type=int, default=None, help="Base seed, worker i is seeded with seed + i")
+    parser.add_argument("--vec-env", type=str, default="subproc", choices=["subproc", "batched"],
+                        help="Run boards in worker processes (subproc) or all in this process (batched)")
+    parser.add_argument("--start-method", type=str, default="forkserver", choices=["fork", "forkserver"],
+                        help="Multiprocessing start method for the environment workers")
+    parser.add_argument("--worker-threads", type=int, default=1, help="Torch/BLAS threads allowed in each worker")
+    parser.add_argument("--replay-ratio", type=float, default=0.25,
+                        help="Gradient steps per collected transition")
+    parser.add_argument("--buffer-dtype", type=str, default="float32", choices=["float32", "float16", "uint8"],
+                        help="Store replay observations quantized to cut buffer memory")
+    parser.add_argument("--settle-frames", type=int, default=0,
+                        help="End a drop once every fruit has been still for N substeps (0 always runs the full drop)")
+    parser.add_argument("--profile-env", action="store_true",
+                        help="Time each phase of the env step and log the ms per phase to TensorBoard")
+    parser.add_argument("--start-pool", type=str, default=None,
+                        help="Rebuild random starts from this pool of pre-settled boards (see start_pool.py)")
+    parser.add_argument("--reuse-objects", type=str, default="none", choices=["none", "particles", "space"],
+                        help="Recycle merged fruits (particles), or also reset the pymunk space in place (space)")
+    parser.add_argument("--eval-freq", type=int, default=250000,
+                        help="Evaluate a checkpoint every N timesteps in background processes (0 disables)")
+    parser.add_argument("--eval-episodes", type=int, default=20, help="Seeded episodes per evaluation")
+    parser.add_argument("--eval-workers", type=int, default=2, help="Evaluator processes")
     args = parser.parse_args()
 
     log_dir = "logs_dqn/"
@@ -19,10 +53,44 @@ def main():
         'render_mode': 'rgb_array',
         'action_type': 'discrete',
         'discrete_bins': 128,
-        'max_fruits': 50
+        'max_fruits': 50,
+        'settle_frames': args.settle_frames,
+        'profile': args.profile_env,
+        'start_pool': args.start_pool,
+        'pool_particles': args.reuse_objects != "none",
+        'reuse_space': args.reuse_objects == "space",
     }
     
-    vec_env = make_vec_env(lambda: SuikaEnv(**env_kwargs), n_envs=1)
+    if args.vec_env == "batched":
+        vec_env = VecMonitor(SuikaVecEnv(args.n_envs, **env_kwargs))
+        vec_env.seed(args.seed)
+    elif args.n_envs > 1:
+        with worker_thread_env(args.worker_threads):
+            vec_env = make_vec_env(
+                make_worker_env,
+                n_envs=args.n_envs,
+                seed=args.seed,
+                env_kwargs=dict(env_kwargs, worker_threads=args.worker_threads),
+                vec_env_cls=SubprocVecEnv,
+                vec_env_kwargs={'start_method': args.start_method},
+            )
+    else:
+        vec_env = make_vec_env(lambda: SuikaEnv(**env_kwargs), n_envs=1, seed=args.seed)
+
+    # train_freq counts vec_env.step calls, each of which collects n_envs
+    # transitions. Train at least once per call and scale gradient_steps so the
+    # replay ratio stays fixed instead of the learner stalling the workers.
+    train_freq = max(1, 4 // args.n_envs)
+    gradient_steps = max(1, round(args.replay_ratio * train_freq * args.n_envs))
+
+    # the replay buffer is never saved with the model, so this also applies
+    # when continuing from --model
+    buffer_kwargs = {}
+    if args.buffer_dtype != "float32":
+        buffer_kwargs = {
+            "replay_buffer_class": QuantizedReplayBuffer,
+            "replay_buffer_kwargs": {"obs_dtype": args.buffer_dtype},
+        }
 
     model = None
     if args.model:
@@ -32,7 +100,8 @@ def main():
                 "learning_rate": 5e-5,
                 "exploration_initial_eps": 0.1,
                 "exploration_final_eps": 0.02,
-                "exploration_fraction": 0.05
+                "exploration_fraction": 0.05,
+                **buffer_kwargs,
             }
             model = DQN.load(args.model, env=vec_env, tensorboard_log=log_dir, custom_objects=custom_objects)
             
@@ -40,6 +109,8 @@ def main():
             model.exploration_initial_eps = 0.1
             model.exploration_final_eps = 0.02
             model.exploration_fraction = 0.05
+            model.train_freq = TrainFreq(train_freq, TrainFrequencyUnit.STEP)
+            model.gradient_steps = gradient_steps
         else:
             print(f"Error: Model path '{args.model}' not found. Starting fresh.")
     
@@ -53,24 +124,40 @@ def main():
         buffer_size=1000000, 
         learning_starts=50000,
         target_update_interval=10000,
-        train_freq=4,
-        gradient_steps=1,
+        train_freq=train_freq,
+        gradient_steps=gradient_steps,
         exploration_fraction=0.1, 
         exploration_final_eps=0.02,
         learning_rate=1e-4,
         gamma=0.99,
         policy_kwargs=dict(net_arch=[256, 256]),
+        **buffer_kwargs,
     )
 
     print("Starting/Continuing training with DQN (MlpPolicy - Features)...")
     
     checkpoint_callback = CheckpointCallback(
-        save_freq=500000,
+        save_freq=max(500000 // args.n_envs, 1),
         save_path='./models_dqn/',
         name_prefix='suika_dqn_mlp'
     )
 
-    model.learn(total_timesteps=10000000, callback=checkpoint_callback)
+    # env-steps/sec is always logged, the per-phase ms only with --profile-env
+    timing_callback = StepTimingCallback(log_freq=max(1000 // args.n_envs, 1))
+
+    callbacks = [checkpoint_callback, timing_callback]
+    if args.eval_freq > 0:
+        callbacks.append(AsyncEvalCallback(
+            env_kwargs,
+            eval_freq=max(args.eval_freq // args.n_envs, 1),
+            n_episodes=args.eval_episodes,
+            n_workers=args.eval_workers,
+            eval_dir="./eval_dqn/",
+            start_method=args.start_method,
+            verbose=1,
+        ))
+
+    model.learn(total_timesteps=10000000, callback=CallbackList(callbacks))
 
     model.save("suika_dqn_mlp_final")
     print("Training finished and model saved.")
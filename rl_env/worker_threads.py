@@ -0,0 +1,29 @@
+import os
+from contextlib import contextmanager
+
+# Worker processes (env workers, evaluators, evaluate.py boards) only run
+# pymunk, so keep torch/BLAS from spinning up a thread pool per process and
+# fighting the learner for cores. The libraries read these variables when
+# they load, so they have to be in place before a worker first imports torch.
+# Kept free of torch/SB3 imports so workers can use it before that happens.
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+def limit_threads(threads=1):
+    # for a worker's own process, before torch loads
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+
+@contextmanager
+def worker_thread_env(worker_threads):
+    # set only while the workers (and the forkserver they fork from) start,
+    # then put the learner's own environment back
+    saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    limit_threads(worker_threads)
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                del os.environ[var]
+            else:
+                os.environ[var] = value
@@ -1,15 +1,13 @@
 import sys
 
-import cv2
-import numpy as np
 import pygame
 import pymunk
-from PIL import Image
 
 from cloud import Cloud
 from collision import collide
 from config import config, CollisionTypes
 from particle import Particle
+from recorder import VideoRecorder
 from text import score, gameover
 from wall import Wall
 
@@ -35,13 +33,11 @@ handler = space.add_collision_handler(CollisionTypes.PARTICLE, CollisionTypes.PA
 handler.begin = collide
 handler.data["score"] = 0
 
-loop_counter = 0
-frame_skip = 2
-writer = cv2.VideoWriter(
+recorder = VideoRecorder(
     "scenes/playback_part2.mp4",
-    cv2.VideoWriter.fourcc("a", "v", "c", "1"),
-    config.screen.fps // frame_skip,
+    config.screen.fps,
     (config.screen.width, config.screen.height),
+    frame_skip=2,
 )
 
 while not game_over:
@@ -68,7 +64,6 @@ while not game_over:
                     cloud.curr.n = 5
                 elif event.key == pygame.K_6:
                     cloud.curr.n = 6
-                cloud.curr.sprite = config[cloud.curr.n, "blit"]
 
     if wait_for_next > 1:
         wait_for_next -= 1
@@ -94,15 +89,15 @@ while not game_over:
     space.step(1/config.screen.fps)
     pygame.display.update()
 
-    loop_counter += 1
-    if loop_counter % frame_skip == 0:
-        data = pygame.image.tostring(pygame.display.get_surface(), 'RGB')
-        img = Image.frombytes('RGB', (config.screen.width, config.screen.height), data)
-        writer.write(np.array(img)[..., ::-1])
-    print(f"\rfps: {clock.get_fps():.4f}", end="", flush=True)
+    if recorder.due():
+        recorder.capture(screen)
+    print(f"\rfps: {clock.get_fps():.4f} dropped: {recorder.dropped}", end="", flush=True)
 
     clock.tick(config.screen.fps)
 
+stats = recorder.close()
+print(f"\nRecorded {stats['written']} frames, dropped {stats['dropped']}")
+
 while True:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
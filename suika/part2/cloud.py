@@ -2,9 +2,10 @@ from .preparticle import PreParticle
 
 
 class Cloud:
-    def __init__(self):
-        self.curr = PreParticle()
-        self.next = PreParticle()
+    def __init__(self, rng=None):
+        self.rng = rng
+        self.curr = PreParticle(rng)
+        self.next = PreParticle(rng)
 
     def draw(self, screen, wait):
         self.curr.draw(screen, wait)
@@ -15,4 +16,4 @@ class Cloud:
 
     def step(self):
         self.curr = self.next
-        self.next = PreParticle()
+        self.next = PreParticle(self.rng)
@@ -24,16 +24,25 @@ class Config:
         self.screen = ConfigNode(**self.config["screen"])
         self.pad = ConfigNode(**self.config["pad"])
         self.physics = ConfigNode(**self.config["physics"])
+        self.render = ConfigNode(**self.config["render"])
 
         self.fruit_names = ["cherry", "strawberry", "grapes", "orange",
                             "persimmon", "apple", "pear", "peach", "pineapple",
                             "melon", "watermelon"]
 
+        # Sprites are loaded on first use so headless code never touches them
+        self._sprites_loaded = False
+        self._background_blit = None
+        self._cloud_blit = None
+
+        self.screen_center = (self.screen.width // 2, self.screen.height // 2)
+
+    def _load_sprites(self):
         blits_dir = os.path.join(PARENT_DIR, "blits")
         
         try:
-            self.background_blit = pygame.image.load(os.path.join(blits_dir, "background.png"))
-            self.cloud_blit = pygame.image.load(os.path.join(blits_dir, "cloud.png"))
+            self._background_blit = pygame.image.load(os.path.join(blits_dir, "background.png"))
+            self._cloud_blit = pygame.image.load(os.path.join(blits_dir, "cloud.png"))
     
             for name in self.fruit_names:
                 self.config[name]["blit"] = pygame.transform.scale(
@@ -41,15 +50,29 @@ class Config:
                     size=self.config[name]["size"],
                 )
         except pygame.error:
-            self.background_blit = pygame.Surface((self.screen.width, self.screen.height))
-            self.cloud_blit = pygame.Surface((50, 50)) 
+            self._background_blit = pygame.Surface((self.screen.width, self.screen.height))
+            self._cloud_blit = pygame.Surface((50, 50)) 
             for name in self.fruit_names:
                 self.config[name]["blit"] = pygame.Surface(self.config[name]["size"])
 
-        self.screen_center = (self.screen.width // 2, self.screen.height // 2)
+        self._sprites_loaded = True
+
+    @property
+    def background_blit(self):
+        if not self._sprites_loaded:
+            self._load_sprites()
+        return self._background_blit
+
+    @property
+    def cloud_blit(self):
+        if not self._sprites_loaded:
+            self._load_sprites()
+        return self._cloud_blit
 
     def __getitem__(self, key):
         index, field = key
+        if field == "blit" and not self._sprites_loaded:
+            self._load_sprites()
         fruit = self.fruit_names[index]
         return self.config[fruit][field]
 
@@ -1,15 +1,24 @@
 import numpy as np
-import pygame
 import pymunk
 
 from .config import config, CollisionTypes
+from .sprite_cache import sprite_cache
+
+
+class _Body(pymunk.Body):
+    # pymunk's typing mixin routes every attribute write through a Python
+    # __setattr__ that only calls object's; fruits are written a dozen times
+    # each time a board is restored
+    __setattr__ = object.__setattr__
 
 
 class Particle(pymunk.Circle):
+    __setattr__ = object.__setattr__
+
     def __init__(self, pos, n, space):
         self.n = n % 11
         super().__init__(
-            body=pymunk.Body(body_type=pymunk.Body.DYNAMIC),
+            body=_Body(body_type=pymunk.Body.DYNAMIC),
             radius=config[self.n, "radius"],
         )
         self.body.position = tuple(pos)
@@ -17,38 +26,93 @@ class Particle(pymunk.Circle):
         self.elasticity = config.physics.elasticity
         self.collision_type = CollisionTypes.PARTICLE
         self.friction = config.physics.fruit_friction
+        self._enter(space)
+
+    def _enter(self, space):
         self.has_collided = False
         self.alive = True
+        registry = getattr(space, "particles", None)
+        if registry is not None:
+            registry.add(self)
         space.add(self.body, self)
 
+    def _reuse(self, pos, n, space):
+        # Turns a killed particle into a fresh one of type n at pos. Setting
+        # the radius keeps the old mass, so density is set again afterwards,
+        # which leaves mass and moment exactly as a new Circle would get them.
+        self.n = n % 11
+        radius = config[self.n, "radius"]
+        if radius != self.radius:
+            self.unsafe_set_radius(radius)
+            self.density = config.physics.density
+        body = self.body
+        body.velocity = (0, 0)
+        body.angular_velocity = 0
+        # the solver leaves a bias velocity on the body that the next step
+        # would still move it by; a zero-length integration clears it
+        pymunk.Body.update_position(body, 0)
+        body.angle = 0
+        body.position = tuple(pos)
+        body.force = (0, 0)
+        body.torque = 0
+        self._enter(space)
+
     def draw(self, screen):
         if self.alive:
-            sprite = pygame.transform.rotate(
-                config[self.n, "blit"].copy(),
-                -self.body.angle * 180/np.pi,
-            )
-            screen.blit(sprite, self.sprite_pos(sprite))
+            sprite, (dx, dy) = sprite_cache.get(self.n, self.body.angle)
+            x, y = self.body.position
+            screen.blit(sprite, (x + dx, y + dy))
 
     def kill(self, space):
         space.remove(self.body, self)
         self.alive = False
+        registry = getattr(space, "particles", None)
+        if registry is not None:
+            registry.discard(self)
+        pool = getattr(space, "particle_pool", None)
+        if pool is not None:
+            pool.release(self)
 
     @property
     def pos(self):
         return np.array(self.body.position)
 
-    def sprite_pos(self, sprite):
-        x, y = self.body.position
-        w, h = sprite.get_size()
-        a, b = self.sprite_offset
-        return x - w / 2 + a, y - h / 2 + b
 
-    @property
-    def sprite_offset(self):
-        ang = self.body.angle
-        mat = np.array([
-            [np.cos(ang), -np.sin(ang)],
-            [np.sin(ang), np.cos(ang)],
-        ])
-        arr = np.array(config[self.n, "offset"])
-        return mat @ arr
+class ParticlePool:
+    # Free-list of killed particles, reused by spawn() for spaces that have
+    # one as space.particle_pool. A particle killed during a step is only
+    # taken out of the space once the step ends, so it waits in pending
+    # until then and merges within a step always get an older particle.
+    def __init__(self):
+        self._free = []
+        self._pending = []
+        self.created = 0
+        self.reused = 0
+
+    def release(self, particle):
+        self._pending.append(particle)
+
+    def take(self, pos, n, space):
+        if self._pending:
+            waiting = []
+            for p in self._pending:
+                (self._free if p.space is None else waiting).append(p)
+            self._pending = waiting
+        if self._free:
+            particle = self._free.pop()
+            particle._reuse(pos, n, space)
+            self.reused += 1
+            return particle
+        self.created += 1
+        return Particle(pos, n, space)
+
+    def __len__(self):
+        return len(self._free) + len(self._pending)
+
+
+def spawn(pos, n, space):
+    # Particle(pos, n, space), recycled from the space's pool if it has one
+    pool = getattr(space, "particle_pool", None)
+    if pool is not None:
+        return pool.take(pos, n, space)
+    return Particle(pos, n, space)
@@ -2,17 +2,20 @@ import numpy as np
 import pygame
 
 from .config import config
-from .particle import Particle
+from .particle import spawn
 
-rng = np.random.default_rng()
+shared_rng = np.random.default_rng()
 
 
 class PreParticle:
-    def __init__(self):
+    def __init__(self, rng=None, n=None):
+        if rng is None:
+            rng = shared_rng
+        if n is None:
+            n = rng.integers(0, 5)
         self.x = config.screen.width // 2
-        self.n = rng.integers(0, 5)
+        self.n = n
         self.radius = config[self.n, "radius"]
-        self.sprite = config[self.n, "blit"]
 
     def draw(self, screen, wait):
         screen.blit(config.cloud_blit, (self.x, 8))
@@ -29,6 +32,10 @@ class PreParticle:
     def pre_draw(self, screen):
         screen.blit(self.sprite, self._sprite_pos((1084, 185)))
 
+    @property
+    def sprite(self):
+        return config[self.n, "blit"]
+
     @property
     def sprite_pos(self):
         return self._sprite_pos((self.x, config.pad.top))
@@ -45,4 +52,4 @@ class PreParticle:
         self.x = np.clip(x, left_lim, right_lim)
 
     def release(self, space):
-        return Particle((self.x, config.pad.top), self.n, space)
+        return spawn((self.x, config.pad.top), self.n, space)
@@ -0,0 +1,120 @@
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+
+class VideoRecorder:
+    # Records pygame Surfaces to a video file without stalling the game loop.
+    # capture() only memcpys the surface's raw pixels into one of a fixed
+    # pool of preallocated frames and queues it; a writer thread does the
+    # channel conversion and encoding. When every frame in the pool is still
+    # waiting to be written the new frame is dropped instead of blocking,
+    # unless block=True (offline recording, where every frame matters more
+    # than the loop's speed).
+    def __init__(self, path, fps, size, frame_skip=1, queue_size=32, block=False, fourcc=("avc1", "mp4v")):
+        self.path = path
+        self.size = tuple(size)
+        self.frame_skip = max(1, frame_skip)
+        self.queue_size = queue_size
+        self.block = block
+
+        # H.264 is not in every OpenCV build, so fall back through the codecs
+        codecs = [fourcc] if isinstance(fourcc, str) else list(fourcc)
+        for codec in codecs:
+            self.writer = cv2.VideoWriter(path, cv2.VideoWriter.fourcc(*codec), fps / self.frame_skip, self.size)
+            if self.writer.isOpened():
+                self.fourcc = codec
+                break
+        else:
+            raise RuntimeError(f"Could not open video writer for {path} with any of {codecs}")
+
+        self._frames = None
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._conversion = None
+
+        self.frame_count = 0
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def due(self):
+        # call once per game frame; True on the frames frame_skip keeps, so
+        # callers can skip drawing frames that will not be recorded
+        self.frame_count += 1
+        return (self.frame_count - 1) % self.frame_skip == 0
+
+    def capture(self, surface):
+        if surface.get_size() != self.size:
+            raise ValueError(f"Surface size {surface.get_size()} does not match recorder size {self.size}")
+        if self._frames is None:
+            self._allocate(surface)
+
+        try:
+            index = self._free.get(block=self.block)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        raw = np.frombuffer(surface.get_buffer(), dtype=np.uint8)
+        np.copyto(self._frames[index], raw.reshape(self._frames[index].shape))
+        del raw
+        self._pending.put(index)
+        self.queued += 1
+        return True
+
+    def _allocate(self, surface):
+        if surface.get_bytesize() != 4:
+            raise ValueError("VideoRecorder needs a 32-bit surface")
+        # frames keep the surface's row pitch and byte order; the writer
+        # thread crops the padding and reorders channels to BGR
+        w, h = self.size
+        self._frames = np.empty((self.queue_size, h, surface.get_pitch() // 4, 4), dtype=np.uint8)
+        for index in range(self.queue_size):
+            self._free.put(index)
+
+        rshift, _, bshift, _ = surface.get_shifts()
+        self._conversion = cv2.COLOR_RGBA2BGR if rshift < bshift else cv2.COLOR_BGRA2BGR
+
+    def _write_loop(self):
+        w, _ = self.size
+        while True:
+            index = self._pending.get()
+            if index is None:
+                break
+            bgr = cv2.cvtColor(self._frames[index, :, :w], self._conversion)
+            self._free.put(index)
+            self.writer.write(bgr)
+            self.written += 1
+
+    @property
+    def backlog(self):
+        return self._pending.qsize()
+
+    def stats(self):
+        return {
+            "frames": self.frame_count,
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "backlog": self.backlog,
+        }
+
+    def close(self):
+        # waits for the queued frames to be encoded before finalising the file
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self.writer.release()
+        return self.stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
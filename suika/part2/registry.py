@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class ParticleRegistry:
+    # Insertion-ordered set of the live particles in a space. Particles add
+    # themselves on creation and drop out on kill, so callers can walk just
+    # the fruits instead of filtering every shape in the space.
+    #
+    # Each particle also owns a slot in a struct-of-arrays view (positions,
+    # radii, types, alive) for building observations. Types and radii are
+    # written once on add and the alive mask is flipped on add/discard.
+    # Positions are only pulled from pymunk by refresh(), which is still one
+    # Python read per fruit, so it is called once per observation; the
+    # per-substep game-over check queries the space instead (see
+    # collision.any_over_line).
+    def __init__(self, capacity=64):
+        self._particles = {}
+        self._free = []
+        self._next_slot = 0
+
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.radii = np.zeros(capacity, dtype=np.float64)
+        self.types = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    @property
+    def capacity(self):
+        return len(self.alive)
+
+    def add(self, particle):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._next_slot == self.capacity:
+                self._grow()
+            slot = self._next_slot
+            self._next_slot += 1
+
+        self._particles[particle] = slot
+        self.radii[slot] = particle.radius
+        self.types[slot] = particle.n
+        self.alive[slot] = True
+
+    def discard(self, particle):
+        slot = self._particles.pop(particle, None)
+        if slot is not None:
+            self.alive[slot] = False
+            self._free.append(slot)
+
+    def clear(self):
+        self._particles.clear()
+        self._free = []
+        self._next_slot = 0
+        self.alive[:] = False
+
+    def refresh(self):
+        if not self._particles:
+            return
+        slots = list(self._particles.values())
+        self.positions[slots] = [p.body.position for p in self._particles]
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name in ("positions", "radii", "types", "alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def __iter__(self):
+        return iter(self._particles)
+
+    def __len__(self):
+        return len(self._particles)
+
+    def __contains__(self, particle):
+        return particle in self._particles
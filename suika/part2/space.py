@@ -0,0 +1,20 @@
+import pymunk
+
+
+class _OrderedSet(dict):
+    # the subset of set that pymunk's deferred add/remove queues use
+    def update(self, objs):
+        for o in objs:
+            self[o] = None
+
+
+class DeterministicSpace(pymunk.Space):
+    # pymunk queues the adds and removes made during a step (merges from the
+    # collision handler) in sets and applies them after the step. Set order
+    # follows object ids, so the order bodies reach Chipmunk, and with it the
+    # simulation, changed from process to process. Applying them in the order
+    # they were made keeps a seeded episode reproducible anywhere.
+    def __init__(self, threaded=False):
+        super().__init__(threaded)
+        self._add_later = _OrderedSet()
+        self._remove_later = _OrderedSet()
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from .config import config
+
+
+class RotatedSpriteCache:
+    # Fruit sprites pre-rotated to angles snapped to `step` degrees, together
+    # with the offset from the body position to the sprite's top-left corner.
+    # Entries are built on first use and evicted least-recently-used once
+    # their pixel data exceeds max_bytes.
+    def __init__(self, step=2.0, max_bytes=64 * 1024 * 1024):
+        self.step = step
+        self.max_bytes = max_bytes
+        self.n_angles = int(round(360 / step))
+        self._entries = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, n, angle):
+        index = int(round(-angle * 180 / np.pi / self.step)) % self.n_angles
+        key = (n, index)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        entry = self._build(n, index)
+        self._entries[key] = entry
+        self.nbytes += self._size(entry[0])
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (old, _) = self._entries.popitem(last=False)
+            self.nbytes -= self._size(old)
+        return entry
+
+    def _build(self, n, index):
+        degrees = index * self.step
+        sprite = pygame.transform.rotate(config[n, "blit"], degrees)
+        # matching the window's pixel format makes every later blit a copy
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+
+        ang = -degrees * np.pi / 180
+        mat = np.array([
+            [np.cos(ang), -np.sin(ang)],
+            [np.sin(ang), np.cos(ang)],
+        ])
+        a, b = mat @ np.array(config[n, "offset"])
+        w, h = sprite.get_size()
+        return sprite, (a - w / 2, b - h / 2)
+
+    def _size(self, sprite):
+        w, h = sprite.get_size()
+        return w * h * sprite.get_bytesize()
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+
+sprite_cache = RotatedSpriteCache(
+    step=config.render.rotation_step,
+    max_bytes=config.render.sprite_cache_mb * 1024 * 1024,
+)
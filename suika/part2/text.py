@@ -2,9 +2,16 @@ import pygame
 
 from .config import config
 
-pygame.font.init()
-score_font = pygame.font.SysFont("noteworthy", 36, True)
-over_font = pygame.font.SysFont("noteworthy", 72, True)
+_fonts = {}
+
+
+def font(size):
+    # Fonts are created on first draw so importing this module stays headless
+    if size not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[size] = pygame.font.SysFont("noteworthy", size, True)
+    return _fonts[size]
 
 
 def center(label, screen, loc):
@@ -17,10 +24,10 @@ def center(label, screen, loc):
 
 
 def score(val, screen: pygame.Surface):
-    label = score_font.render(str(val), True, (255, 230, 128))
+    label = font(36).render(str(val), True, (255, 230, 128))
     center(label, screen, config.screen.score)
 
 
 def gameover(screen):
-    label = over_font.render("Game Over!", True, (0, 0, 0))
+    label = font(72).render("Game Over!", True, (0, 0, 0))
     center(label, screen, config.screen_center)